@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CategoryAggregates:
+    """Dataset-level numbers shown on a category overview tab."""
+
+    total_videos: int
+    total_duration: int
+    total_views: int
+    overall_mean: float
+    # publishedDate (day), views (mean of that day), total_views, videos
+    daily: pd.DataFrame
+    # channelName, views (sum); sorted by views, largest first
+    channel_views: pd.DataFrame
+    # channelName, count; sorted by count, largest first
+    channel_counts: pd.DataFrame
+    # (min, max) for the sidebar filters
+    date_range: tuple
+    views_range: tuple
+    duration_range: tuple
+
+
+class AggregateAccumulator:
+    """
+    Builds CategoryAggregates from a dataset fed in chunks.
+
+    Only running totals are kept (per day, per channel and global), so the
+    memory used does not depend on the number of rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.titles = 0
+        self.duration = 0
+        self.views = 0
+        self.day_views = pd.Series(dtype="int64")
+        self.day_videos = pd.Series(dtype="int64")
+        self.channel_views = pd.Series(dtype="int64")
+        self.channel_videos = pd.Series(dtype="int64")
+        self.ranges = {}
+
+    def add(self, df):
+        if df.empty:
+            return self
+        self.rows += len(df)
+        self.titles += int(df["title"].count())
+        self.duration += int(df["duration"].sum())
+        self.views += int(df["views"].sum())
+
+        by_day = df["views"].groupby(df["publishedDate"].dt.normalize())
+        self.day_views = self.day_views.add(by_day.sum(), fill_value=0)
+        self.day_videos = self.day_videos.add(by_day.size(), fill_value=0)
+
+        channels = df["channelName"].astype("string")
+        by_channel = df["views"].groupby(channels)
+        self.channel_views = self.channel_views.add(by_channel.sum(), fill_value=0)
+        self.channel_videos = self.channel_videos.add(by_channel.size(), fill_value=0)
+
+        for column in ("publishedDate", "views", "duration"):
+            low, high = df[column].min(), df[column].max()
+            if column in self.ranges:
+                low, high = min(low, self.ranges[column][0]), max(high, self.ranges[column][1])
+            self.ranges[column] = (low, high)
+        return self
+
+    def result(self):
+        day_views = self.day_views.astype("int64").sort_index()
+        day_videos = self.day_videos.astype("int64").sort_index()
+        daily = pd.DataFrame({"views": day_views / day_videos,
+                              "total_views": day_views,
+                              "videos": day_videos}).rename_axis("publishedDate").reset_index()
+
+        # channel names in alphabetical order first, so ties keep a stable order
+        channel_views = (self.channel_views.astype("int64").sort_index()
+                         .sort_values(ascending=False, kind="stable")
+                         .rename("views").rename_axis("channelName").reset_index())
+        channel_counts = (self.channel_videos.astype("int64").sort_index()
+                          .sort_values(ascending=False, kind="stable")
+                          .rename("count").rename_axis("channelName").reset_index())
+
+        return CategoryAggregates(
+            total_videos=self.titles,
+            total_duration=self.duration,
+            total_views=self.views,
+            overall_mean=self.views / self.rows if self.rows else float("nan"),
+            daily=daily,
+            channel_views=channel_views,
+            channel_counts=channel_counts,
+            date_range=self.ranges.get("publishedDate", (None, None)),
+            views_range=tuple(int(v) for v in self.ranges.get("views", (0, 0))),
+            duration_range=tuple(int(v) for v in self.ranges.get("duration", (0, 0))),
+        )
+
+
+def compute_aggregates(df):
+    return AggregateAccumulator().add(df).result()
@@ -0,0 +1,267 @@
+"""
+Headless benchmarks of the dashboard's data and chart paths.
+
+    python benchmark.py                      # the category csvs
+    python benchmark.py --rows 1000000       # plus a synthetic 1M row gaming dataset
+    python benchmark.py --output bench.json
+
+Results are printed (or written) as JSON so runs can be compared between versions.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import plotly
+
+from aggregates import compute_aggregates
+from categories import CATEGORIES
+from charts import (average_views_figure, channel_bar_figure, duration_views_figure, top_videos_figure,
+                    top_view_per_day_figure)
+from data_loader import (OVERVIEW_COLUMNS, build_snapshot, ingest_csv, load_category, parse_dates,
+                         read_category_csv)
+from filters import FilterEngine, FilterQuery
+from indexes import ChannelIndex, log_edges
+from query import top_k
+from model import ViewModel
+from store import CategoryStore
+from text_index import TextIndex
+from timeseries import choose_resolution, day_number, day_numbers, mean_views_per_bucket, resample_daily
+
+# rows appended to the csv per refresh in bench_refresh
+REFRESH_DELTAS = (100, 1_000, 10_000)
+
+def synthetic_dataset(path, n_rows, template="gaming.csv", seed=0):
+    """
+    Write a csv with n_rows rows in the category schema.
+
+    Titles, descriptions and channel names are drawn from the template csv;
+    channels are multiplied so the channel count grows with the row count.
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(template)
+    picks = rng.integers(0, len(source), n_rows)
+    copies = max(1, n_rows // (len(source) * 4))
+    start = pd.Timestamp("2015-01-01")
+    published = start + pd.to_timedelta(rng.integers(0, 10 * 365 * 86400, n_rows), unit="s")
+    df = pd.DataFrame({
+        "title": source["title"].to_numpy()[picks],
+        "description": source["description"].to_numpy()[picks],
+        "publishedDate": published.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "channelName": source["channelName"].to_numpy()[picks] + " " + rng.integers(0, copies, n_rows).astype(str),
+        "views": rng.lognormal(12, 2, n_rows).astype("int64"),
+        "duration": rng.integers(10, 20_000, n_rows),
+        "isShort": rng.random(n_rows) < 0.2,
+    })
+    df.to_csv(path, index=False)
+    return path
+
+
+def peak_memory(statement, path):
+    """Peak resident bytes of a fresh interpreter running statement with the csv at `path` (Linux)."""
+    script = ("import sys\n"
+              "import pandas as pd\n"
+              "from data_loader import CSV_DTYPES, ingest_csv\n"
+              "path = sys.argv[1]\n"
+              f"{statement}\n"
+              "print(open('/proc/self/status').read().split('VmHWM:')[1].split()[0])")
+    output = subprocess.run([sys.executable, "-c", script, os.path.abspath(path)], check=True,
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    # VmHWM (KiB) belongs to the new process image; ru_maxrss would carry over the benchmark's own peak
+    return int(output.stdout.split()[-1]) * 1024
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"min_s": min(timings), "median_s": statistics.median(timings), "repeat": repeat}
+
+
+def bench_dataset(name, path, repeat=5):
+    results = []
+
+    def record(stage, fn, n=repeat):
+        results.append({"dataset": name, "stage": stage, **measure(fn, n)})
+
+    # load
+    record("csv_load", lambda: read_category_csv(path), n=min(repeat, 3))
+    raw_dates = pd.read_csv(path, usecols=["publishedDate"])["publishedDate"]
+    record("date_parse", lambda: parse_dates(raw_dates))
+    record("date_parse_inferred", lambda: pd.to_datetime(raw_dates).dt.date, n=min(repeat, 3))
+    record("snapshot_ingest", lambda: ingest_csv(path), n=1)
+    # streaming ingest vs. parsing the whole csv at once, each in its own interpreter;
+    # baseline_bytes is the interpreter with the imports alone
+    results.append({"dataset": name, "stage": "peak_memory",
+                    "baseline_bytes": peak_memory("pass", path),
+                    "ingest_bytes": peak_memory("ingest_csv(path)", path),
+                    "read_csv_bytes": peak_memory("pd.read_csv(path, dtype=CSV_DTYPES)", path)})
+    build_snapshot(path)
+    record("snapshot_load", lambda: load_category(path))
+    record("snapshot_load_projected", lambda: load_category(path, OVERVIEW_COLUMNS))
+
+    # overview
+    df = load_category(path, OVERVIEW_COLUMNS)
+    rows = len(df)
+    # in-memory size: the whole csv with pandas defaults vs. everything a store holds, as the
+    # app warms it (frame, indexes, aggregates, model) and after a keyword search (descriptions
+    # and text index too)
+    store = CategoryStore(path)
+    store.model()
+    memory = {"store_bytes": int(store.memory_usage().sum())}
+    store.text_index()
+    memory["store_text_bytes"] = int(store.memory_usage().sum())
+    results.append({"dataset": name, "stage": "memory",
+                    "default_bytes": int(pd.read_csv(path).memory_usage(deep=True).sum()), **memory})
+    record("aggregate", lambda: compute_aggregates(df))
+    agg = compute_aggregates(df)
+    freq = choose_resolution(*agg.date_range)[0]
+    record("figure_average_views", lambda: average_views_figure(resample_daily(agg.daily, freq), agg.overall_mean))
+    record("figure_channel_views", lambda: channel_bar_figure(agg.channel_views.head(20), "views", "Total Views"))
+
+    # detailed analysis for the channel with most videos
+    record("channel_index", lambda: ChannelIndex(df))
+    index = ChannelIndex(df)
+    channel = agg.channel_counts["channelName"].iloc[0]
+    query = FilterQuery(channel, agg.date_range[0].date(), agg.date_range[1].date(),
+                        *agg.views_range, *agg.duration_range)
+    # a fresh engine every time, so the memoized result is not measured
+    record("filter", lambda: FilterEngine(index).evaluate(query))
+    engine = FilterEngine(index)
+    view = engine.evaluate(query)
+    record("filter_memoized", lambda: engine.evaluate(query))
+
+    # views/duration range of the channel: scanning its rows vs. intervals of the range index
+    start, stop = index.span(channel)
+    rows_of_channel = index.frame.iloc[index.order[start:stop]]
+    low_views, high_views = rows_of_channel["views"].quantile([0.25, 0.75]).astype(int)
+    bounds = {"views": (low_views, high_views), "duration": agg.duration_range}
+    record("range_filter_scan", lambda: rows_of_channel["views"].between(low_views, high_views) &
+           rows_of_channel["duration"].between(*agg.duration_range))
+    record("range_filter_index", lambda: index.select(start, stop, bounds))
+    edges = log_edges(*agg.views_range)
+    record("histogram_numpy", lambda: np.histogram(rows_of_channel["views"].to_numpy(), edges))
+    record("histogram_index", lambda: index.histogram("views", channel, edges))
+    # the same range over the whole dataset (cross-category queries): scan vs. the one-group range index
+    record("range_filter_all_scan", lambda: np.flatnonzero(df["views"].between(low_views, high_views).to_numpy()))
+    record("range_filter_all_index", lambda: index.select_all({"views": (low_views, high_views)}))
+
+    # whole dataset: publish dates as python date objects vs. day numbers
+    dates = df["publishedDate"]
+
+    def filter_day_numbers():
+        days = day_numbers(dates)
+        return (days >= day_number(query.start_date)) & (days <= day_number(query.end_date))
+    record("date_filter_objects", lambda: dates.dt.date.between(query.start_date, query.end_date))
+    record("date_filter_day_numbers", filter_day_numbers)
+    record("daily_groupby_objects", lambda: df["views"].groupby(dates.dt.date).mean())
+    record("daily_groupby_day_numbers", lambda: df["views"].groupby(day_numbers(dates)).mean())
+
+    # keyword search: inverted index vs. scanning the text
+    text = df["title"].str.cat(load_category(path, ["description"])["description"], sep=" ", na_rep="")
+    record("text_index", lambda: TextIndex(text, day_numbers(dates)), n=min(repeat, 3))
+    text_index = TextIndex(text, day_numbers(dates))
+    keyword = text_index.terms[len(text_index.terms) // 2].as_py()
+    record("keyword_search_index", lambda: text_index._search(keyword))
+    record("keyword_search_contains", lambda: text.str.contains(keyword, case=False, regex=False))
+
+    # view model: training on the dataset, scoring the dataset and the filtered channel
+    record("model_train", lambda: ViewModel(df))
+    model = ViewModel(df)
+    record("model_score", lambda: model.predict(df))
+    record("model_score_filtered", lambda: model.predict(view.in_ranges))
+
+    detail_freq = choose_resolution(query.start_date, query.end_date)[0]
+    record("figure_top_view_per_day",
+           lambda: top_view_per_day_figure(mean_views_per_bucket(view.in_dates, detail_freq, by=["channelName"]),
+                                           agg.overall_mean))
+    record("figure_top_videos", lambda: top_videos_figure(top_k(view.in_ranges, "views", 10)))
+    record("top_k_sort", lambda: df.sort_values("views", ascending=False).head(10))
+    record("top_k_argpartition", lambda: top_k(df, "views", 10))
+    record("figure_duration_views", lambda: duration_views_figure(view.in_ranges))
+    record("figure_duration_views_all_rows", lambda: duration_views_figure(df), n=min(repeat, 3))
+
+    for result in results:
+        result["rows"] = rows
+    return results
+
+
+def bench_refresh(name, path, tmp, repeat=5):
+    """
+    CategoryStore.refresh() after rows are appended to a copy of the csv,
+    per delta size, against loading the store from scratch. The text index
+    and model are built first, so the refresh keeps them up to date too.
+    """
+    path = shutil.copy(path, os.path.join(tmp, f"refresh_{os.path.basename(path)}"))
+    results = []
+
+    def load():
+        store = CategoryStore(path)
+        store.text_index()
+        store.model()
+        return store
+    build_snapshot(path)
+    results.append({"dataset": name, "stage": "store_load", **measure(load, min(repeat, 3))})
+    store = load()
+    for n in REFRESH_DELTAS:
+        delta = pd.read_csv(path, nrows=n)
+        timings = []
+        for _ in range(repeat):
+            delta.to_csv(path, mode="a", header=False, index=False)
+            start = time.perf_counter()
+            store.refresh()
+            timings.append(time.perf_counter() - start)
+        results.append({"dataset": name, "stage": "store_refresh", "delta_rows": len(delta),
+                        "min_s": min(timings), "median_s": statistics.median(timings), "repeat": repeat})
+    for result in results:
+        result["rows"] = len(store.frame)
+    return results
+
+
+def run(rows=(), repeat=5, workdir=None):
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for category in CATEGORIES:
+            results += bench_dataset(category.key, category.path, repeat)
+            results += bench_refresh(category.key, category.path, tmp, repeat)
+        for n in rows:
+            path = synthetic_dataset(os.path.join(tmp, f"synthetic_{n}.csv"), n)
+            results += bench_dataset(f"synthetic_{n}", path, repeat)
+            results += bench_refresh(f"synthetic_{n}", path, tmp, repeat)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plotly": plotly.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="*", default=[], help="sizes of synthetic gaming datasets")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    else:
+        print(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Category:
+    """One dashboard tab backed by a csv with the youtube video columns."""
+
+    name: str
+    path: str
+    icon: str
+    # prefix of the widget and session state keys of the tab
+    key: str
+    # singular used in widget labels ("📌 Movie Channel")
+    label: str
+
+    @property
+    def tab_title(self):
+        return f"{self.icon} {self.name}"
+
+
+# adding a category is adding a csv and an entry here
+CATEGORIES = [
+    Category(name="Gaming", path="gaming.csv", icon="🎮", key="gaming", label="Gaming"),
+    Category(name="Movies", path="movies.csv", icon="📽️", key="movies", label="Movie"),
+    Category(name="Music", path="music.csv", icon="🎵", key="music", label="Music"),
+]
@@ -0,0 +1,224 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+PALETTE = px.colors.qualitative.Pastel
+
+
+def add_overall_mean(fig, overall_avg):
+    # dashed line at the dataset-wide mean
+    fig.add_hline(y=overall_avg,
+                  line_color="#ec5353",
+                  line_dash="dash",
+                  annotation_text=f"Overall Mean: {overall_avg:.2f}",
+                  annotation_position="top right")
+    return fig
+
+
+def average_views_figure(series, overall_avg, title="Daily Average Views"):
+    fig = px.line(series,
+                  x="publishedDate",
+                  y="views",
+                  title=title,
+                  color_discrete_sequence=PALETTE)
+    return add_overall_mean(fig, overall_avg)
+
+
+def channel_bar_figure(top, x, x_label):
+    fig = px.bar(top, x=x, y="channelName", orientation="h",
+                 labels={x: x_label, "channelName": "Channel Name"},
+                 title=f"🔥 Channel Video Count Top {len(top)}", color="channelName",
+                 color_discrete_sequence=PALETTE)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def keyword_bar_figure(top, title="🔤 Top Keywords"):
+    fig = px.bar(top, x="score", y="term", orientation="h",
+                 labels={"score": "TF-IDF Score", "term": "Keyword"},
+                 title=title, color="term",
+                 color_discrete_sequence=PALETTE)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def category_totals_figure(totals, x, x_label):
+    fig = px.bar(totals.astype({"category": "str"}), x=x, y="category", orientation="h",
+                 labels={x: x_label, "category": "Category"},
+                 title=f"📊 {x_label} per Category", color="category",
+                 color_discrete_sequence=PALETTE)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def top_channels_figure(split):
+    # split: channelName, category, views; one bar per channel stacked by category, largest first
+    split = split.astype({"channelName": "str", "category": "str"})
+    order = split.groupby("channelName")["views"].sum().sort_values(ascending=False).index.tolist()
+    fig = px.bar(split, x="views", y="channelName", orientation="h", color="category",
+                 labels={"views": "Total Views", "channelName": "Channel Name", "category": "Category"},
+                 title=f"🔥 Top {len(order)} Channels by Views (All Categories)",
+                 category_orders={"channelName": order},
+                 color_discrete_sequence=PALETTE)
+    return fig
+
+
+def top_view_per_day_figure(series, overall_avg, title="Top View Per Day"):
+    fig = px.line(series,
+                  x="publishedDate",
+                  y="views",
+                  title=title,
+                  markers=True,
+                  color_discrete_sequence=PALETTE)
+    return add_overall_mean(fig, overall_avg)
+
+
+def channel_comparison_figure(series, title="Channel Comparison"):
+    # one line per channel
+    fig = px.line(series,
+                  x="publishedDate",
+                  y="views",
+                  color="channelName",
+                  title=title,
+                  labels={"channelName": "Channel Name"},
+                  markers=len(series) <= 200,
+                  color_discrete_sequence=PALETTE)
+    return fig
+
+
+def keyword_trend_figure(series, title="Keyword Trend"):
+    fig = px.line(series,
+                  x="publishedDate",
+                  y="videos",
+                  title=title,
+                  labels={"videos": "Videos"},
+                  markers=len(series) <= 200,
+                  color_discrete_sequence=PALETTE)
+    return fig
+
+
+def range_histogram_figure(edges, counts, low, high, title):
+    # counts per bin between consecutive integer edges; bins overlapping [low, high] are highlighted
+    selected = (edges[1:] >= low) & (edges[:-1] <= high)
+    fig = go.Figure(go.Bar(
+        x=[f"{edge:,}" for edge in edges[:-1]],
+        y=counts,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        marker_color=np.where(selected, PALETTE[0], "#d9d9d9"),
+        hovertemplate="%{customdata[0]:,} - %{customdata[1]:,}<br>videos: %{y}<extra></extra>"))
+    fig.update_layout(title=title, height=220, margin={"l": 0, "r": 0, "t": 30, "b": 0},
+                      bargap=0.05, xaxis={"type": "category", "showticklabels": False})
+    return fig
+
+
+def top_videos_figure(top_videos):
+    fig = px.bar(top_videos, x="views", y="title",
+                 title="🔥 Top 10 Videos by View",
+                 color="title",
+                 color_discrete_sequence=PALETTE)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+# "Duration vs. Views" switches to WebGL and then to a binned density view as rows grow
+SCATTER_WEBGL_THRESHOLD = 2_000
+SCATTER_POINT_BUDGET = 20_000
+DENSITY_BINS = 60
+
+
+def duration_views_figure(df, webgl_threshold=SCATTER_WEBGL_THRESHOLD, point_budget=SCATTER_POINT_BUDGET):
+    if len(df) > point_budget:
+        return duration_views_density_figure(df)
+    fig = px.scatter(df, x="duration", y="views",
+                     title="⏳ Duration vs. Views",
+                     size="views",
+                     render_mode="webgl" if len(df) > webgl_threshold else "svg",
+                     color_discrete_sequence=PALETTE)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def duration_views_density_figure(df, bins=DENSITY_BINS):
+    # the 2d histogram is computed here so only bins x bins counts reach the browser
+    counts, duration_edges, views_edges = np.histogram2d(
+        df["duration"].to_numpy(), df["views"].to_numpy(), bins=bins)
+    counts = np.where(counts > 0, counts, np.nan)
+    fig = go.Figure(go.Heatmap(
+        x=(duration_edges[:-1] + duration_edges[1:]) / 2,
+        y=(views_edges[:-1] + views_edges[1:]) / 2,
+        z=counts.T,
+        colorscale="Blues",
+        colorbar={"title": "Videos"},
+        hovertemplate="duration: %{x:,.0f}<br>views: %{y:,.0f}<br>videos: %{z}<extra></extra>"))
+    fig.update_layout(title=f"⏳ Duration vs. Views ({len(df):,} videos)",
+                      xaxis_title="duration", yaxis_title="views")
+    return fig
+
+
+def predicted_views_figure(df, webgl_threshold=SCATTER_WEBGL_THRESHOLD, point_budget=SCATTER_POINT_BUDGET):
+    # df: title, views, predicted; every n-th row beyond the point budget
+    shown = df.iloc[::-(-len(df) // point_budget)] if len(df) > point_budget else df
+    fig = px.scatter(shown, x="views", y="predicted", hover_name="title",
+                     title=f"🤖 Predicted vs. Actual Views ({len(df):,} videos)",
+                     labels={"views": "Actual Views", "predicted": "Predicted Views"},
+                     log_x=True, log_y=True,
+                     render_mode="webgl" if len(shown) > webgl_threshold else "svg",
+                     color_discrete_sequence=PALETTE)
+    # perfect predictions lie on the diagonal
+    if len(df):
+        low = max(1, min(df["views"].min(), df["predicted"].min()))
+        high = max(df["views"].max(), df["predicted"].max())
+        fig.add_shape(type="line", x0=low, y0=low, x1=high, y1=high, line={"color": "#ec5353", "dash": "dash"})
+    return fig
+
+
+class FigureCache:
+    """
+    Process-wide LRU cache of finished plotly figures.
+
+    Memory is bounded by the serialized (json) size of the cached figures.
+    Figures are shared between sessions and must not be modified after
+    they are built.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        fig = build()
+        size = len(pio.to_json(fig, validate=False))
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (fig, size)
+                self._size += size
+                while self._size > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._size -= evicted
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size,
+                    "hits": self.hits, "misses": self.misses}
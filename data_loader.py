@@ -0,0 +1,331 @@
+import glob
+import hashlib
+import io
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# column types of the category csv files (title,description,publishedDate,channelName,views,duration,isShort)
+CSV_DTYPES = {
+    "title": "string",
+    "description": "string",
+    "channelName": "category",
+    "views": "int64",
+    "duration": "int64",
+    "isShort": "bool",
+}
+DATE_COLUMN = "publishedDate"
+# publishedDate looks like 2024-08-27T18:03:44.430Z
+DATE_FORMAT = "ISO8601"
+# everything except the long free-text description
+OVERVIEW_COLUMNS = ["title", "publishedDate", "channelName", "views", "duration", "isShort"]
+
+# parquet snapshot written next to each csv, tagged with the csv it was built from
+SNAPSHOT_SUFFIX = ".parquet"
+SIGNATURE_KEY = b"source_signature"
+# bytes of the csv covered by the snapshot and a hash of the bytes before that offset
+OFFSET_KEY = b"source_bytes"
+TAIL_KEY = b"source_tail"
+TAIL_BYTES = 4096
+SNAPSHOT_SCHEMA = pa.schema([
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("publishedDate", pa.timestamp("us")),
+    ("channelName", pa.dictionary(pa.int32(), pa.string())),
+    ("views", pa.int64()),
+    ("duration", pa.int64()),
+    ("isShort", pa.bool_()),
+])
+# uncompressed Arrow copy of the overview columns, memory-mapped by every process serving the csv
+SHARED_SUFFIX = ".arrow"
+# rows parsed at a time when streaming a csv into its snapshot
+INGEST_CHUNK_ROWS = 10_000
+# counts kept in memory in the smallest integer type that holds them
+COMPACT_COLUMNS = ["views", "duration"]
+
+
+def file_signature(path):
+    # (mtime, size) of a dataset file, used as cache key so a changed file is re-read
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def parse_dates(values):
+    # timestamps are stored in UTC, keep them as naive datetime64
+    return pd.to_datetime(values, format=DATE_FORMAT, utc=True).dt.tz_localize(None)
+
+
+def compact(df):
+    """Downcast the integer columns of a loaded dataset in place; sums still come out as int64."""
+    for column in df.columns.intersection(COMPACT_COLUMNS):
+        df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def read_category_csv(path, columns=None):
+    """Read one category csv with explicit column types."""
+    df = pd.read_csv(path, dtype=CSV_DTYPES, usecols=columns)
+    if DATE_COLUMN in df:
+        df[DATE_COLUMN] = parse_dates(df[DATE_COLUMN])
+    return df
+
+
+def snapshot_path(path):
+    return os.path.splitext(path)[0] + SNAPSHOT_SUFFIX
+
+
+def delta_path(path, offset):
+    # rows appended to the csv after byte `offset`
+    return f"{os.path.splitext(path)[0]}.delta-{offset:015d}{SNAPSHOT_SUFFIX}"
+
+
+def snapshot_parts(path):
+    """Snapshot files of the csv at path: the base snapshot, then its deltas in append order."""
+    base = snapshot_path(path)
+    if not os.path.exists(base):
+        return []
+    deltas = glob.glob(f"{glob.escape(os.path.splitext(path)[0])}.delta-*{SNAPSHOT_SUFFIX}")
+    return [base, *sorted(deltas)]
+
+
+def encode_signature(signature):
+    # file_signature as stored in file metadata under SIGNATURE_KEY
+    return ",".join(str(part) for part in signature).encode()
+
+
+def _decode_signature(encoded):
+    return tuple(int(part) for part in encoded.split(b","))
+
+
+def _line_end(path, start, stop):
+    # offset just after the last newline in bytes [start, stop) of the file, start without one;
+    # a last line without its newline may still be being written
+    with open(path, "rb") as f:
+        while stop > start:
+            block = max(start, stop - TAIL_BYTES)
+            f.seek(block)
+            newline = f.read(stop - block).rfind(b"\n")
+            if newline >= 0:
+                return block + newline + 1
+            stop = block
+    return start
+
+
+class _Prefix(io.RawIOBase):
+    # the first `size` bytes of a binary file, so a parser never reads past them
+    def __init__(self, f, size):
+        self.f = f
+        self.left = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.f.readinto(memoryview(buffer)[:self.left])
+        self.left -= n
+        return n
+
+
+def _tail_hash(path, offset):
+    # hash of the bytes just before offset, to tell an append from a rewrite
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - TAIL_BYTES))
+        return hashlib.sha1(f.read(offset - f.tell())).hexdigest().encode()
+
+
+def _source_metadata(path, signature, offset):
+    # signature: of the csv when it was parsed, taken before reading it
+    return {SIGNATURE_KEY: encode_signature(signature),
+            OFFSET_KEY: str(offset).encode(),
+            TAIL_KEY: _tail_hash(path, offset)}
+
+
+def snapshot_metadata(path):
+    # source metadata of the newest snapshot part, None without a snapshot
+    parts = snapshot_parts(path)
+    if not parts:
+        return None
+    return pq.read_schema(parts[-1]).metadata or {}
+
+
+def snapshot_is_fresh(path):
+    metadata = snapshot_metadata(path)
+    return metadata is not None and metadata.get(SIGNATURE_KEY) == encode_signature(file_signature(path))
+
+
+@contextmanager
+def atomic_write(target):
+    """
+    Path of a temp file to write instead of target, moved over target when
+    the block completes, so concurrent readers never see a half written
+    file; removed when the block fails.
+    """
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_part(target, tables, schema):
+    with atomic_write(target) as tmp, pq.ParquetWriter(tmp, schema) as writer:
+        for table in tables:
+            writer.write_table(table)
+
+
+def ingest_csv(path, chunk_rows=INGEST_CHUNK_ROWS, signature=None):
+    """
+    Stream the csv at path into its parquet snapshot.
+
+    Only one chunk of rows is in memory at a time, so files larger than
+    memory can be ingested. Only the complete lines of the file as of `signature` (taken now by
+    default) are parsed, so rows appended meanwhile are left to the next
+    refresh.
+    """
+    signature = file_signature(path) if signature is None else signature
+    end = _line_end(path, 0, signature[1])
+    schema = SNAPSHOT_SCHEMA.with_metadata(_source_metadata(path, signature, end))
+
+    def tables():
+        with open(path, "rb") as f:
+            for chunk in pd.read_csv(io.BufferedReader(_Prefix(f, end)), dtype=CSV_DTYPES, chunksize=chunk_rows):
+                chunk[DATE_COLUMN] = parse_dates(chunk[DATE_COLUMN])
+                yield pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+    _write_part(snapshot_path(path), tables(), schema)
+    # a full ingest replaces earlier deltas
+    for delta in snapshot_parts(path)[1:]:
+        os.remove(delta)
+
+
+def append_snapshot(path, signature):
+    """
+    Parse only the rows appended to the csv since its snapshot was written.
+
+    signature is the csv's file signature, taken before reading it; only
+    complete lines up to its size are parsed. The new rows are stored as a
+    delta part next to the snapshot. Returns (delta rows, signature the
+    snapshot had before), the delta empty while no complete row that
+    parses was appended yet (a writer is still appending). Returns None
+    when the csv was not simply appended to (edited, truncated, or no
+    snapshot yet) and needs a full ingest.
+    """
+    metadata = snapshot_metadata(path)
+    if metadata is None or OFFSET_KEY not in metadata:
+        return None
+    offset = int(metadata[OFFSET_KEY])
+    size = signature[1]
+    if size <= offset or _tail_hash(path, offset) != metadata[TAIL_KEY]:
+        return None
+    previous = _decode_signature(metadata[SIGNATURE_KEY])
+    end = _line_end(path, offset, size)
+    with open(path, "rb") as f:
+        f.seek(offset - 1)
+        data = f.read(end - offset + 1)
+    # the snapshot must end on a complete line
+    if not data.startswith(b"\n"):
+        return None
+    if end == offset:
+        return pd.DataFrame(columns=SNAPSHOT_SCHEMA.names), previous
+    try:
+        delta = pd.read_csv(io.BytesIO(data[1:]), names=SNAPSHOT_SCHEMA.names, header=None, dtype=CSV_DTYPES)
+        delta[DATE_COLUMN] = parse_dates(delta[DATE_COLUMN])
+    except ValueError:
+        # parser errors included: lines still being written, the next refresh tries again
+        return pd.DataFrame(columns=SNAPSHOT_SCHEMA.names), previous
+    schema = SNAPSHOT_SCHEMA.with_metadata(_source_metadata(path, signature, end))
+    _write_part(delta_path(path, offset), [pa.Table.from_pandas(delta, schema=schema, preserve_index=False)], schema)
+    return delta, previous
+
+
+def refresh_snapshot(path, since=None):
+    """
+    Bring the snapshot up to date with the csv.
+
+    Returns (status, delta, signature); signature is the csv's file
+    signature as of the data the snapshot now holds. status is
+    - "fresh": the snapshot already matched the csv;
+    - "appended": delta holds the rows appended to the csv since `since`,
+      the signature of the data the caller has loaded;
+    - "rebuilt": the snapshot was rewritten, or extended past data the
+      caller never loaded; load it again;
+    - "pending": the csv is being appended to, nothing new to load yet;
+    - "failed": the snapshot can't be written (read-only data directory).
+    """
+    signature = file_signature(path)
+    metadata = snapshot_metadata(path)
+    if metadata is not None and metadata.get(SIGNATURE_KEY) == encode_signature(signature):
+        return "fresh", None, signature
+    try:
+        appended = append_snapshot(path, signature)
+        if appended is None:
+            ingest_csv(path, signature=signature)
+            return "rebuilt", None, signature
+    except OSError:
+        return "failed", None, signature
+    delta, previous = appended
+    if delta.empty:
+        return "pending", None, previous
+    if previous != since:
+        return "rebuilt", None, signature
+    return "appended", delta, signature
+
+
+def build_snapshot(path):
+    # False when the snapshot can't be written
+    return refresh_snapshot(path)[0] != "failed"
+
+
+def read_snapshot(path, columns=None):
+    tables = [pq.read_table(part, columns=columns) for part in snapshot_parts(path)]
+    return pa.concat_tables(tables).to_pandas()
+
+
+def load_category(path, columns=None):
+    """
+    Load a category dataset, only reading the requested columns.
+
+    The csv is parsed once and stored as a parquet snapshot next to it;
+    later loads read the snapshot until the csv changes.
+    """
+    if snapshot_is_fresh(path) or build_snapshot(path):
+        return compact(read_snapshot(path, columns))
+    return compact(read_category_csv(path, columns))
+
+
+def shared_path(path):
+    return os.path.splitext(path)[0] + SHARED_SUFFIX
+
+
+def load_shared(path, columns=OVERVIEW_COLUMNS):
+    """
+    Like load_category, but the frame is backed by a memory-mapped Arrow file.
+
+    Every process serving the csv maps the same file, so the column buffers
+    are held once in the page cache instead of once per process. The
+    mapped columns are read-only.
+    """
+    target = shared_path(path)
+    signature = encode_signature(file_signature(path))
+    if not os.path.exists(target) or pa.ipc.open_file(target).schema.metadata.get(SIGNATURE_KEY) != signature:
+        table = pa.Table.from_pandas(load_category(path, columns), preserve_index=False)
+        table = table.replace_schema_metadata({SIGNATURE_KEY: signature})
+        with atomic_write(target) as tmp, pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # split_blocks keeps numeric columns as views of the mapped buffers instead of one copied block
+    return pa.ipc.open_file(pa.memory_map(target)).read_all().to_pandas(split_blocks=True)
+
+
+def load_preview(path, n=5):
+    # first n rows without reading the whole file
+    if snapshot_is_fresh(path):
+        batch = next(pq.ParquetFile(snapshot_path(path)).iter_batches(batch_size=n))
+        return batch.to_pandas()
+    return read_category_csv(path).head(n)
@@ -0,0 +1,73 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from timeseries import day_number
+
+
+class FilterQuery(NamedTuple):
+    """Sidebar state of a Detailed Analysis section."""
+
+    channel: str
+    start_date: object
+    end_date: object
+    min_views: int
+    max_views: int
+    min_duration: int
+    max_duration: int
+    # lowercase words (text_index.tokenize) that must all appear in the title or description, "" for none
+    keyword: str = ""
+
+
+class FilteredView(NamedTuple):
+    # channel rows published between start_date and end_date (cards, Top View Per Day)
+    in_dates: pd.DataFrame
+    # channel rows within the views and duration ranges (Top 10, scatter, table)
+    in_ranges: pd.DataFrame
+
+
+class FilterEngine:
+    """
+    Evaluates FilterQuery objects against one dataset.
+
+    Results are memoized per query (least recently used are dropped first)
+    and shared between callers, so they must be treated as read-only.
+    """
+
+    def __init__(self, channel_index, search=None, maxsize=64):
+        self.index = channel_index
+        # search(keyword): bool mask over the rows of the index's frame, needed for FilterQuery.keyword
+        self.search = search
+        self.evaluate = lru_cache(maxsize=maxsize)(self._evaluate)
+        self.compare = lru_cache(maxsize=maxsize)(self._compare)
+
+    def _select(self, start, stop, bounds, keyword):
+        # sorted frame positions of the channel span [start, stop) within bounds, see ChannelIndex.select
+        positions = self.index.select(start, stop, bounds)
+        if keyword:
+            positions = positions[self.search(keyword)[positions]]
+        return positions
+
+    def _evaluate(self, query):
+        start, stop = self.index.span(query.channel)
+        frame = self.index.frame
+        # ranges are intervals of the channel's sorted columns, not scans of its rows;
+        # widget dates become day numbers, the rows never become date objects
+        days = (day_number(query.start_date), day_number(query.end_date))
+        in_dates = self._select(start, stop, {"days": days}, query.keyword)
+        in_ranges = self._select(start, stop, {"views": (query.min_views, query.max_views),
+                                               "duration": (query.min_duration, query.max_duration)},
+                                 query.keyword)
+        return FilteredView(in_dates=frame.iloc[in_dates], in_ranges=frame.iloc[in_ranges])
+
+    def _compare(self, channels, start_date, end_date, keyword=""):
+        # rows of all compared channels published between start_date and end_date;
+        # channels must be a tuple
+        days = (day_number(start_date), day_number(end_date))
+        positions = [self._select(*self.index.span(channel), {"days": days}, keyword) for channel in channels]
+        return self.index.frame.iloc[np.concatenate([self.index.order[0:0], *positions])]
+
+    def cache_info(self):
+        return self.evaluate.cache_info()
@@ -0,0 +1,231 @@
+import copy
+import sys
+
+import numpy as np
+
+from timeseries import day_numbers
+
+# columns with a RangeIndex in ChannelIndex.ranges (publish days as "days")
+RANGE_COLUMNS = ("views", "duration")
+HISTOGRAM_BINS = 30
+
+
+def log_edges(low, high, bins=HISTOGRAM_BINS):
+    """Integer bin edges from low to high, evenly spaced on a log scale (views and durations are skewed)."""
+    return np.unique(np.round(np.geomspace(low + 1, high + 1, bins + 1)).astype("int64") - 1)
+
+
+def position_dtype(n_rows):
+    # row positions are stored in 32 bits while they fit
+    return np.int32 if n_rows < 2 ** 31 else np.int64
+
+
+def column_values(df, column, positions=slice(None)):
+    # values of column at positions of df; "days" are publish day numbers (32 bits are plenty)
+    if column == "days":
+        return day_numbers(df["publishedDate"].iloc[positions]).astype(np.int32)
+    return df[column].to_numpy()[positions]
+
+
+class RangeIndex:
+    """
+    Values of one column sorted within groups of rows.
+
+    The groups are consecutive slices of a grouped position array (a
+    channel's span of ChannelIndex.order). Within every group `order`
+    holds the frame positions sorted by value and `values` the values in
+    that order, so a range of values is two searchsorted calls on the
+    group's slice and its rows are a slice of `order`. Counts per bin
+    (widget histograms) come from the same sorted values.
+    """
+
+    def __init__(self, order, values):
+        self.order = order
+        self.values = values
+
+    @classmethod
+    def build(cls, values, grouped, offsets):
+        # values: the column in frame order; grouped: frame positions, group by group
+        values = values[grouped]
+        group = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        low = int(values.min()) if len(values) else 0
+        span = int(values.max()) - low + 1 if len(values) else 1
+        if (len(offsets) - 1) * span < 2 ** 62:
+            # one int64 key (group, value) sorts several times faster than lexsort
+            order = np.argsort(group * span + (values.astype("int64") - low), kind="stable")
+        else:
+            order = np.lexsort((values, group))
+        return cls(grouped[order], values[order])
+
+    def inserted(self, offsets, groups, rows, values):
+        """
+        Index with appended rows added: frame positions `rows` (ascending,
+        after every indexed row) in `groups` with `values`; offsets are the
+        current group bounds. Costs a search per new row plus one copy.
+        """
+        # rows inserted at the same point keep this order
+        new = np.lexsort((values, groups))
+        groups, rows, values = groups[new], rows[new], values[new]
+        # binary search of every new row's value in its group, all rows at once;
+        # equal values go after the old ones like in build()
+        lo = offsets[groups].astype(np.intp)
+        hi = offsets[groups + 1].astype(np.intp)
+        while (searching := lo < hi).any():
+            mid = (lo + hi) // 2
+            right = self.values[np.minimum(mid, len(self.values) - 1)] <= values
+            lo = np.where(searching & right, mid + 1, lo)
+            hi = np.where(searching & ~right, mid, hi)
+        dtype = np.result_type(self.values, values)
+        return RangeIndex(np.insert(self.order, lo, rows),
+                          np.insert(self.values.astype(dtype, copy=False), lo, values))
+
+    @property
+    def nbytes(self):
+        return self.order.nbytes + self.values.nbytes
+
+    def _keys(self, keys):
+        # searchsorted with keys of another dtype converts the whole column first
+        info = np.iinfo(self.values.dtype)
+        return np.clip(keys, info.min, info.max).astype(self.values.dtype)
+
+    def interval(self, start, stop, low, high):
+        """(lo, hi) of the rows of the group [start, stop) with low <= value <= high (integers)."""
+        values = self.values[start:stop]
+        low, high = self._keys([low, high])
+        return (start + int(np.searchsorted(values, low, "left")),
+                start + int(np.searchsorted(values, high, "right")))
+
+    def counts(self, start, stop, edges):
+        """Rows of the group [start, stop) per bin between consecutive integer edges, the last bin closed."""
+        values = self.values[start:stop]
+        edges = self._keys(edges)
+        below = np.searchsorted(values, edges, "left")
+        below[-1] = np.searchsorted(values, edges[-1], "right")
+        return np.diff(below)
+
+
+class ChannelIndex:
+    """
+    Rows of a dataset grouped by channelName, as positions into its frame.
+
+    `order` lists the frame positions channel by channel (in frame order
+    within a channel), so a channel's rows are the slice of `order` between
+    two offsets instead of a mask over all rows. The frame itself is not
+    copied; an index can cover only some of its rows (a partition).
+
+    `ranges` sorts the range columns within every channel; `overall` sorts
+    them over all indexed rows as one group, for range filters without a
+    channel (select_all).
+    """
+
+    def __init__(self, df, rows=None, column="channelName"):
+        # rows: sorted positions of the rows to index, all rows by default
+        channels = df[column].astype("category")
+        codes = channels.cat.codes.to_numpy()
+        rows = np.asarray(np.arange(len(df)) if rows is None else rows, dtype=position_dtype(len(df)))
+        # stable: frame order within a channel
+        order = rows[np.argsort(codes[rows], kind="stable")]
+        # rows without a channel (code -1) sort first, skip them
+        order_codes = codes[order]
+        skipped = int((order_codes < 0).sum())
+        counts = np.bincount(order_codes[skipped:], minlength=len(channels.cat.categories))
+
+        self.column = column
+        self.frame = df
+        self.order = order[skipped:]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.positions = {name: i for i, name in enumerate(channels.cat.categories)}
+        columns = [column for column in RANGE_COLUMNS if column in df]
+        if "publishedDate" in df:
+            columns.append("days")
+        values = {column: column_values(df, column) for column in columns}
+        # range filters of a channel become intervals of these
+        self.ranges = {column: RangeIndex.build(values[column], self.order, self.offsets) for column in columns}
+        self.overall = {column: RangeIndex.build(values[column], rows, np.array([0, len(rows)]))
+                        for column in columns}
+
+    def extended(self, df, new_rows):
+        """
+        Index of df, the frame of this index with rows appended, also covering
+        new_rows of it (ascending). The new rows are inserted into the sorted
+        arrays; nothing already indexed is sorted again.
+        """
+        channels = df[self.column]
+        new_rows = np.asarray(new_rows, dtype=position_dtype(len(df)))
+        codes = channels.cat.codes.to_numpy()[new_rows]
+        values = {column: column_values(df, column, new_rows) for column in self.ranges}
+        # all new rows go into overall, those with a channel into the channel spans
+        index = copy.copy(self)
+        index.overall = {column: ranges.inserted(np.array([0, len(ranges.order)]), np.zeros(len(new_rows), np.intp),
+                                                 new_rows, values[column])
+                         for column, ranges in self.overall.items()}
+        with_channel = codes >= 0
+        new_rows, codes = new_rows[with_channel], codes[with_channel]
+        # appended channels are new categories after the old ones, with empty groups
+        offsets = np.concatenate([self.offsets, np.repeat(self.offsets[-1], len(channels.cat.categories) -
+                                                          len(self.positions))])
+
+        index.frame = df
+        # a channel's new rows come after its old ones, which keeps frame order
+        by_channel = np.argsort(codes, kind="stable")
+        index.order = np.insert(self.order, offsets[codes[by_channel] + 1], new_rows[by_channel])
+        index.offsets = offsets + np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(offsets) - 1))])
+        added = channels.cat.categories[len(self.positions):]
+        index.positions = {**self.positions, **{name: len(self.positions) + i for i, name in enumerate(added)}}
+        index.ranges = {column: ranges.inserted(offsets, codes, new_rows, values[column][with_channel])
+                        for column, ranges in self.ranges.items()}
+        return index
+
+    @property
+    def nbytes(self):
+        # the names in positions are the frame's categories, only the dict itself is counted
+        return (self.order.nbytes + self.offsets.nbytes + sys.getsizeof(self.positions) +
+                sum(index.nbytes for index in [*self.ranges.values(), *self.overall.values()]))
+
+    def channels(self):
+        # channels with rows in the index
+        return [name for name, i in self.positions.items() if self.offsets[i + 1] > self.offsets[i]]
+
+    def span(self, channel):
+        """(start, stop) of the channel's rows in order; (0, 0) for unknown channels."""
+        i = self.positions.get(channel)
+        if i is None:
+            return 0, 0
+        return self.offsets[i], self.offsets[i + 1]
+
+    def _narrow(self, ranges, start, stop, bounds):
+        # unsorted frame positions of the group [start, stop) of ranges within bounds, None when no bound excludes a row
+        intervals = {column: ranges[column].interval(start, stop, *bound) for column, bound in bounds.items()}
+        narrowed = {column: (lo, hi) for column, (lo, hi) in intervals.items() if (lo, hi) != (start, stop)}
+        if not narrowed:
+            return None
+        # rows of the narrowest interval, checked against the other ranges
+        column = min(narrowed, key=lambda c: narrowed[c][1] - narrowed[c][0])
+        lo, hi = narrowed.pop(column)
+        positions = ranges[column].order[lo:hi]
+        for other in narrowed:
+            values = column_values(self.frame, other, positions)
+            positions = positions[(values >= bounds[other][0]) & (values <= bounds[other][1])]
+        return positions
+
+    def select(self, start, stop, bounds):
+        """
+        Sorted frame positions of the span [start, stop) whose value lies in
+        every inclusive (low, high) of bounds (column -> bounds).
+        """
+        positions = self._narrow(self.ranges, start, stop, bounds)
+        if positions is None:
+            return self.order[start:stop]
+        # back to frame order
+        return np.sort(positions)
+
+    def select_all(self, bounds):
+        """Sorted frame positions of all indexed rows within bounds, like select(); None when that is every row."""
+        if not bounds:
+            return None
+        positions = self._narrow(self.overall, 0, len(self.overall[next(iter(bounds))].order), bounds)
+        return None if positions is None else np.sort(positions)
+
+    def histogram(self, column, channel, edges):
+        """Rows of the channel per bin of column between consecutive edges."""
+        return self.ranges[column].counts(*self.span(channel), edges)
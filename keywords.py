@@ -0,0 +1,146 @@
+"""
+TF-IDF keywords of the video titles and descriptions.
+
+Term counts are extracted in a process pool, chunk by chunk, and kept as a
+sparse (row, term, count) table next to the csv; the top keywords of the
+category and of every channel are computed from it.
+
+    python keywords.py gaming.csv movies.csv music.csv            # precompute, print the top keywords
+    python keywords.py --terms gaming.csv movies.csv music.csv    # only write the term counts
+"""
+import logging
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_loader import SIGNATURE_KEY, atomic_write, encode_signature, file_signature, load_category
+from text_index import TOKEN_PATTERN
+
+logger = logging.getLogger(__name__)
+
+KEYWORDS_SUFFIX = ".keywords.parquet"
+# rows tokenized per task
+CHUNK_ROWS = 2_000
+TOP_KEYWORDS = 15
+# frequent words and link fragments that say nothing about a video
+STOP_WORDS = frozenset("""
+a about after all also am an and any are as at be because been but by can could de did do does for from get
+go got had has have he her here him his how if in into is it its just la like me more my no not now of on
+one only or our out over she so than that the their them then there these they this to too up us was we
+were what when where which who why will with would you your
+
+com http https www bit ly instagram twitter facebook tiktok youtube subscribe channel video videos follow
+link links watch new
+""".split())
+
+
+class KeywordSummary(NamedTuple):
+    # term, score; largest first
+    category: pd.DataFrame
+    # channelName, term, score; the top terms of every channel, largest first
+    channels: pd.DataFrame
+
+
+def keywords_path(path):
+    return os.path.splitext(path)[0] + KEYWORDS_SUFFIX
+
+
+def count_terms(texts, first_row):
+    """Sparse term counts of a chunk of texts: row, term, count (runs in a worker process)."""
+    terms = pd.Series(texts, index=pd.RangeIndex(first_row, first_row + len(texts)), dtype="str")
+    terms = terms.fillna("").str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    terms = terms[~terms.isin(STOP_WORDS) & ~terms.str.isdigit()]
+    counts = terms.groupby([terms.index, terms.to_numpy()]).size()
+    return pd.DataFrame({"row": counts.index.get_level_values(0).astype("int32"),
+                         "term": counts.index.get_level_values(1),
+                         "count": counts.to_numpy().astype("int32")})
+
+
+def extract_terms(texts, workers=None, chunk_rows=CHUNK_ROWS):
+    """Sparse term counts of all texts, tokenized in parallel."""
+    chunks = [(texts[start:start + chunk_rows], start) for start in range(0, len(texts), chunk_rows)]
+    if len(chunks) <= 1 or workers == 1:
+        parts = [count_terms(*chunk) for chunk in chunks]
+    else:
+        # spawned workers: forking a process that runs server threads is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            parts = list(pool.map(count_terms, *zip(*chunks)))
+    if not parts:
+        return count_terms([], 0)
+    return pd.concat(parts, ignore_index=True)
+
+
+def load_terms(path, workers=None):
+    """Term counts of the csv at path, from the keywords file unless the csv changed."""
+    target = keywords_path(path)
+    signature = encode_signature(file_signature(path))
+    if os.path.exists(target) and pq.read_schema(target).metadata.get(SIGNATURE_KEY) == signature:
+        return pq.read_table(target).to_pandas()
+
+    df = load_category(path, ["title", "description"])
+    texts = df["title"].str.cat(df["description"], sep=" ", na_rep="").tolist()
+    terms = extract_terms(texts, workers)
+    table = pa.Table.from_pandas(terms.astype({"term": "category"}), preserve_index=False)
+    with atomic_write(target) as tmp:
+        pq.write_table(table.replace_schema_metadata({SIGNATURE_KEY: signature}), tmp)
+    return terms
+
+
+def summarize(terms, channels, top=TOP_KEYWORDS):
+    """Top TF-IDF terms of the whole category and of every channel; channels is channelName per row."""
+    n_rows = len(channels)
+    terms = terms.astype({"term": "str"})
+    # tf: share of the video's words, idf: smoothed inverse document frequency
+    words = terms.groupby("row")["count"].transform("sum")
+    documents = terms.groupby("term")["row"].transform("size")
+    score = terms["count"] / words * (np.log((1 + n_rows) / (1 + documents)) + 1)
+    scored = pd.DataFrame({"channelName": channels.to_numpy()[terms["row"].to_numpy()],
+                           "term": terms["term"], "score": score})
+
+    category = (scored.groupby("term")["score"].sum()
+                .nlargest(top).rename_axis("term").reset_index())
+    by_channel = scored.groupby(["channelName", "term"], observed=True)["score"].sum().reset_index()
+    by_channel = (by_channel.sort_values(["channelName", "score"], ascending=[True, False], kind="stable")
+                  .groupby("channelName", observed=True).head(top).reset_index(drop=True))
+    return KeywordSummary(category=category, channels=by_channel)
+
+
+def keyword_summary(path, workers=None):
+    channels = load_category(path, ["channelName"])["channelName"]
+    return summarize(load_terms(path, workers), channels)
+
+
+def run_pipeline(path):
+    """
+    keyword_summary for a server: term counts come from this script run in a
+    separate interpreter with --terms, because process pool workers
+    re-import the __main__ module, which inside Streamlit is the app
+    script. The summary is only computed here.
+    """
+    try:
+        done = subprocess.run([sys.executable, os.path.abspath(__file__), "--terms", path],
+                              capture_output=True, text=True)
+        if done.returncode != 0:
+            raise RuntimeError(f"keywords.py exited with status {done.returncode}\n{done.stderr.strip()}")
+        # without a pool in case the csv changed in the meantime
+        return keyword_summary(path, workers=1)
+    except Exception:
+        logger.exception("keyword extraction failed for %s", path)
+        raise
+
+
+if __name__ == "__main__":
+    terms_only = "--terms" in sys.argv[1:]
+    for path in (arg for arg in sys.argv[1:] if arg != "--terms"):
+        if terms_only:
+            load_terms(path)
+        else:
+            print(path, ", ".join(keyword_summary(path).category["term"]))
@@ -1,24 +1,34 @@
-import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-import time
-import plotly.express as px
-
-if "gaming_button" not in st.session_state:
-    st.session_state.gaming_button = False
-if "movies_button" not in st.session_state:
-    st.session_state.movies_button = False
-if "music_button" not in st.session_state:
-    st.session_state.music_button = False
+from categories import CATEGORIES
+from charts import (FigureCache, average_views_figure, category_totals_figure, channel_bar_figure,
+                    channel_comparison_figure, top_channels_figure,
+                    duration_views_figure, keyword_bar_figure, keyword_trend_figure, predicted_views_figure,
+                    range_histogram_figure, top_videos_figure, top_view_per_day_figure)
+from filters import FilterQuery
+from indexes import log_edges
+from keywords import run_pipeline
+from model import HOLDOUT_SHARE
+from profiling import Profiler
+from query import UnifiedStore, top_k
+from store import CategoryStore
+from tables import PAGE_SIZES, get_page, page_count, truncate
+from text_index import tokenize
+from warmup import Warmup
+from timeseries import choose_resolution, day_number, mean_views_per_bucket, resample_daily, videos_per_bucket
+from data_loader import file_signature, load_preview
+
+for category in CATEGORIES:
+    if f"{category.key}_button" not in st.session_state:
+        st.session_state[f"{category.key}_button"] = False
 if 'load_app' not in st.session_state:
     st.session_state.load_app = False
 
 def reset_all_tabs():
-    st.session_state.gaming_button = False
-    st.session_state.movies_button = False
-    st.session_state.music_button = False
+    for category in CATEGORIES:
+        st.session_state[f"{category.key}_button"] = False
 
 def activate_tab(tab_key):
     reset_all_tabs()
@@ -26,16 +36,140 @@ def activate_tab(tab_key):
 
 # set page
 st.set_page_config(page_title="YouTube Dashboard", page_icon="🎬", layout="wide")
-# set tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📑 Introduction", "🎮 Gaming", "📽️ Movies", "🎵 Music", "🔏 Improvement"])
+# set tabs, only the selected tab is rendered on each rerun
+tab_intro, *category_tabs, tab_all, tab_improvement = st.tabs(
+    ["📑 Introduction", *[category.tab_title for category in CATEGORIES], "🌐 All Categories", "🔏 Improvement"],
+    key="active_tab", on_change="rerun")
+
+# channels shown in the overview rankings until the sliders are moved
+DEFAULT_TOP_CHANNELS = 5
+# format picker label -> store partition
+FORMATS = {"All Videos": "all", "Shorts": "shorts", "Long-form": "long"}
+
+def is_open(tab):
+    # .open is None when the tabs don't track state, then every tab renders
+    return tab.open is not False
+
+# timing spans of this session, on with DASHBOARD_PROFILE=1 or ?diagnostics=1
+if "profiler" not in st.session_state:
+    st.session_state.profiler = Profiler()
+profiler = st.session_state.profiler
+profiler.enabled = os.environ.get("DASHBOARD_PROFILE") == "1" or st.query_params.get("diagnostics") == "1"
+
+# one read-only store per dataset shared by all sessions: frame, descriptions, aggregates,
+# channel index and filters; refresh() merges rows appended to the csv and bumps store.version.
+# DASHBOARD_MMAP=1 also shares the frames between server processes through memory-mapped files
+@st.cache_resource(show_spinner=False)
+def load_store(path):
+    return CategoryStore(path, mmap=os.environ.get("DASHBOARD_MMAP") == "1")
+
+def get_store(path):
+    store = load_store(path)
+    store.refresh()
+    return store
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_dataset_preview(path, signature):
+    return load_preview(path)
+
+def get_preview(path):
+    return load_dataset_preview(path, file_signature(path))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_statistics(path, version):
+    return load_store(path).frame.describe(include="number")
+
+def get_statistics(path):
+    return load_statistics(path, get_store(path).version)
+
+# query API over all category stores (no copy of their frames), rebuilt when any of them changes
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_unified(versions):
+    return UnifiedStore({category.name: load_store(category.path) for category in CATEGORIES})
+
+def get_unified():
+    versions = tuple(get_store(category.path).version for category in CATEGORIES)
+    return load_unified(versions), versions
+
+# TF-IDF keywords are extracted off the request path (one category at a time, each in a
+# process pool) as soon as the server starts; pages only show finished results
+@st.cache_resource(show_spinner=False)
+def get_background_executor():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="keywords")
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def keyword_job(path, signature):
+    return get_background_executor().submit(run_pipeline, path)
+
+def get_keywords(path):
+    # KeywordSummary, or None while it is being computed or if extraction failed (see keyword_error)
+    job = keyword_job(path, file_signature(path))
+    if not job.done() or job.exception() is not None:
+        return None
+    return job.result()
+
+def keyword_error(path):
+    # exception of a failed extraction (logged by run_pipeline); None while running or after success
+    job = keyword_job(path, file_signature(path))
+    return job.exception() if job.done() else None
+
+for category in CATEGORIES:
+    keyword_job(category.path, file_signature(category.path))
+
+# finished figures shared by all sessions, keyed on what they are built from
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    return FigureCache(max_bytes=64 * 2**20)
+
+def cached_figure(category, kind, params, build, spans=None):
+    return lookup_figure((category.key, kind, params, load_store(category.path).version), build, spans)
+
+def lookup_figure(key, build, spans=None):
+    # key: (scope, kind, params, version of the data); spans: Profiler timing the lookup,
+    # this session's unless given (the warm-up thread passes its own)
+    spans = profiler if spans is None else spans
+    scope, kind = key[:2]
+    def timed_build():
+        with spans.span(f"{scope}/{kind}/build"):
+            return build()
+    with spans.span(f"{scope}/{kind}/figure"):
+        return get_figure_cache().get_or_build(key, timed_build)
+
+def show_chart(scope, kind, fig):
+    with profiler.span(f"{scope}/{kind}/chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
-# df_gaming = pd.read_csv("pages/data/gaming.csv")
-df_gaming = pd.read_csv("gaming.csv")
-df_movie = pd.read_csv("movies.csv")
-df_music = pd.read_csv("music.csv")
+# overview charts, shared by render_category and the warm-up
+def average_views_chart(category, part, spans=None):
+    agg = part.aggregates
+    freq, adjective, _, _ = choose_resolution(*agg.date_range)
+    return cached_figure(category, "average_views", (part.name, freq),
+                         lambda: average_views_figure(resample_daily(agg.daily, freq), agg.overall_mean,
+                                                      title=f"{adjective} Average Views"), spans)
+
+def channel_views_chart(category, part, n, spans=None):
+    top = part.aggregates.channel_views
+    return cached_figure(category, "channel_views", (part.name, n),
+                         lambda: channel_bar_figure(top.head(n), "views", "Total Views"), spans)
+
+def channel_counts_chart(category, part, n, spans=None):
+    top = part.aggregates.channel_counts
+    return cached_figure(category, "channel_counts", (part.name, n),
+                         lambda: channel_bar_figure(top.head(n), "count", "Count"), spans)
+
+def keywords_chart(category, keywords, spans=None):
+    return cached_figure(category, "keywords", None,
+                         lambda: keyword_bar_figure(keywords.category, title=f"🔤 Top {category.label} Keywords"),
+                         spans)
+
+def with_description(df, path):
+    # description is only read when a table needs it
+    description = load_store(path).descriptions()
+    df.insert(1, "description", description.loc[df.index])
+    return df
 
 ######################################################################### INTRODUCTION #######################################################################
-with tab1:
+def render_introduction():
     # Application introduction
     st.title("🎬 YouTube Data Analysis Dashboard")
     st.write("""
@@ -57,666 +191,296 @@ with tab1:
     """)
     st.markdown("---")
     st.subheader("Dataset Statistics")   
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.write("Gaming")
-        # Dataset statistics
-        st.write(df_gaming.describe())
-        # Dataset size
-        st.write(f"🔹 Total Videos: {df_gaming.shape[0]}")
-        st.write(f"🔹 Total Columns: {df_gaming.shape[1]}")
-    with col2:
-        st.write("Movies")
-        # Dataset statistics
-        st.write(df_movie.describe())
-        # Dataset size
-        st.write(f"🔹 Total Videos: {df_movie.shape[0]}")
-        st.write(f"🔹 Total Columns: {df_movie.shape[1]}")
-    with col3:
-        st.write("Music")
-        # Dataset statistics
-        st.write(df_music.describe())
-        # Dataset size
-        st.write(f"🔹 Total Videos: {df_music.shape[0]}")
-        st.write(f"🔹 Total Columns: {df_music.shape[1]}")
+    for category, col in zip(CATEGORIES, st.columns(len(CATEGORIES))):
+        with col:
+            st.write(category.name)
+            # Dataset statistics
+            st.write(get_statistics(category.path))
+            # Dataset size
+            st.write(f"🔹 Total Videos: {load_store(category.path).aggregates.total_videos}")
+            st.write(f"🔹 Total Columns: {get_preview(category.path).shape[1]}")
     st.markdown("---")
     # Preview data
     st.subheader("Dataset Preview") 
-    st.write("Gaming Dataset")
-    st.dataframe(df_gaming.head())
-
-    st.write("Movie Dataset")
-    st.dataframe(df_movie.head())
+    for category in CATEGORIES:
+        st.write(f"{category.name} Dataset")
+        st.dataframe(get_preview(category.path))
 
-    st.write("Music Dataset")
-    st.dataframe(df_music.head())
 
+########################################################################### CATEGORY ###########################################################################
+def render_category(category):
+    with profiler.span(f"{category.key}/store"):
+        store = get_store(category.path)
 
-############################################################################ GAMING ##########################################################################
-with tab2:
-    # publishedDate to date
-    df_gaming["publishedDate"] = pd.to_datetime(df_gaming["publishedDate"]).dt.date
+    st.title(category.tab_title)
 
-    st.title("🎮 Gaming")
+    # shorts / long-form split: each is a precomputed partition with its own aggregates and indexes
+    format_label = st.radio("Format", list(FORMATS), horizontal=True, key=f"{category.key}_format")
+    part = store.partition(FORMATS[format_label])
+    if part.empty:
+        st.info(f"There are no {format_label.lower()} in the {category.name} dataset.")
+        return
+    agg = part.aggregates
 
     # card
     col1, col2, col3 = st.columns(3)
     with col1:
-        ttl_video = df_gaming["title"].count()
-        st.metric(label="📹 Total Video Published", value=f"{ttl_video:,}")
+        st.metric(label="📹 Total Video Published", value=f"{agg.total_videos:,}")
     with col2:
-        ttl_duration = df_gaming["duration"].sum()
-        st.metric(label="⏳ Total Video Duration (second)", value=f"{ttl_duration:,}")
+        st.metric(label="⏳ Total Video Duration (second)", value=f"{agg.total_duration:,}")
     with col3: 
-        ttl_view = df_gaming["views"].sum()
-        st.metric(label="👁️ Total Number of Views", value=f"{ttl_view:,}")
-
-
-    # line: avg view vs. date
-    df_gaming_1 = df_gaming.groupby("publishedDate")["views"].mean().reset_index()
-    overall_avg = df_gaming["views"].mean()
-    g1 = px.line(df_gaming_1,
-                x="publishedDate",
-                y="views", 
-                title="Monthly Average View",
-                color_discrete_sequence=px.colors.qualitative.Pastel)
-    # avg line
-    g1.add_hline(y=overall_avg, 
-                line_color="#ec5353",
-                line_dash="dash",
-                annotation_text=f"Overall Mean: {overall_avg:.2f}",
-                annotation_position="top right")
-    st.plotly_chart(g1, use_container_width=True)
+        st.metric(label="👁️ Total Number of Views", value=f"{agg.total_views:,}")
 
+    # line: avg view vs. date, bucketed so long histories stay within the point budget
+    g1 = average_views_chart(category, part)
+    show_chart(category.key, "average_views", g1)
 
     # subplots
     col1, col2 = st.columns(2)
 
     # small plot left: 時長
     with col1:
-            st.subheader("📊 Top Views Channel")
-            # Top views - Channel
-            df_gaming_2 = df_gaming.groupby("channelName")["views"].sum().reset_index()
-            df_gaming_2 = df_gaming_2.sort_values("views", ascending=False)
-
-            max_channels_views_gaming = min(len(df_gaming_2), 20)
-            num_channels_views_gaming = st.slider("📏 Number of Gaming Channel_views", min_value = 1, max_value = max_channels_views_gaming, value = 5)
-            top_channelview = df_gaming_2.head(num_channels_views_gaming)
-
-            g2 = px.bar(top_channelview, x = "views", y = "channelName", orientation = "h",
-                  labels = {"views": "Total Views", "channelName": "Channel Name"},
-                  title = f"🔥 Channel Video Count Top {num_channels_views_gaming}", color="channelName",
-                  color_discrete_sequence = px.colors.qualitative.Pastel)
-            g2.update_layout(showlegend=False)
-            st.plotly_chart(g2, use_container_width=True)
+        st.subheader("📊 Top Views Channel")
+        # Top views - Channel
+        max_channels_views = min(len(agg.channel_views), 20)
+        num_channels_views = st.slider(f"📏 Number of {category.label} Channel_views", min_value = 1, max_value = max_channels_views, value = DEFAULT_TOP_CHANNELS)
+        g2 = channel_views_chart(category, part, num_channels_views)
+        show_chart(category.key, "channel_views", g2)
 
     with col2:
         st.subheader("📊 Top Video Published Channel")
-        df_gaming_3 = df_gaming["channelName"].value_counts().reset_index()
-        df_gaming_3 = df_gaming_3.sort_values("count", ascending=False)
-        df_gaming_3 = df_gaming_3.rename(columns={"count":"Num of Video"})
-
-        max_channels_count_gaming = min(len(df_gaming_3), 20)
-        num_channels_count_gaming = st.slider("📏 Number of Gaming Channel_count", min_value = 1, max_value = max_channels_count_gaming, value = 5)
-        top_channels = df_gaming_3.head(num_channels_count_gaming)
-
-        g3 = px.bar(top_channels, x = "Num of Video", y = "channelName", orientation = "h",
-                labels = {"Num of Video": "Count", "channelName": "Channel Name"},
-                title = f"🔥 Channel Video Count Top {num_channels_count_gaming}", color="channelName",
-                color_discrete_sequence = px.colors.qualitative.Pastel)
-        g3.update_layout(showlegend=False)
-        st.plotly_chart(g3, use_container_width = True)
+        max_channels_count = min(len(agg.channel_counts), 20)
+        num_channels_count = st.slider(f"📏 Number of {category.label} Channel_count", min_value = 1, max_value = max_channels_count, value = DEFAULT_TOP_CHANNELS)
+        g3 = channel_counts_chart(category, part, num_channels_count)
+        show_chart(category.key, "channel_counts", g3)
+
+    # keywords
+    keywords = get_keywords(category.path)
+    error = keyword_error(category.path)
+    if error is not None:
+        st.warning(f"🔤 Top keywords could not be extracted: {str(error).splitlines()[0]}")
+    elif keywords is None:
+        st.info("🔤 Top keywords are not available yet, they are extracted in the background.")
+    else:
+        g4 = keywords_chart(category, keywords)
+        show_chart(category.key, "keywords", g4)
 
     ####################################################################################
-    # button 
-    # def click_button():
-        # st.session_state.gaming_button = True
-    # button for detailed nalysis
-    # st.button('Detailed Analysis', on_click=click_button)
-    # 🚀 Gaming Tab 按鈕
-    if st.button("Detailed Analysis - Gaming", key = "gaming_analysis"):
-        activate_tab("gaming_button")
-        st.session_state.gaming_button = True
-        st.session_state.movies_button = False  # 確保 Movies 相關內容關閉
-        st.session_state.music_button = False
-
-    if st.session_state.gaming_button:
-        st.subheader("📈 Channel Analysis")
-        # select date
-        start_date = df_gaming["publishedDate"].min()
-        end_date = df_gaming["publishedDate"].max()
-        options_date = st.sidebar.date_input("Publish Date",
-                            (start_date, end_date),
-                            start_date, end_date,
-                            key = "gaming_date")
-        # select channel
-        df_gaming_uni_channel = df_gaming.drop_duplicates("channelName")
-        channel_option = df_gaming_uni_channel.sort_values("channelName", ascending=True)["channelName"]
-        options_channel = st.sidebar.selectbox("📌 Gaming Channel", channel_option)
-
-        # Display a message
-        # st.write('Gaming Trending Video DataFrame')
-        # Generate a dataframe and display it in the app
-        # st.dataframe(df_gaming.head(10))
-
-        # views & duration
-        with st.sidebar.expander("More Filtering", expanded=False):
-            min_views = int(df_gaming["views"].min())
-            max_views = int(df_gaming["views"].max())
-            min_views_formatted = f"{min_views:,}"
-            max_views_formatted = f"{max_views:,}"
-            min_views = st.number_input("Min Views", min_value=int(min_views), value=int(min_views))
-            max_views = st.number_input("Max Views", max_value=int(max_views), value=int(max_views))
-
-            min_duration = df_gaming["duration"].min()
-            max_duration = df_gaming["duration"].max()
-            min_duration = st.number_input("Min Duration (seconds)", min_value=int(min_duration), value=int(min_duration))
-            max_duration = st.number_input("Max Duration (seconds)", max_value=int(max_duration), value=int(max_duration))
-
-        # card
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            mask = df_gaming["publishedDate"].between(options_date[0], options_date[1]) & df_gaming["channelName"].isin([options_channel])      
-            df_filtered_1 = df_gaming[mask]
-            ttl_video = df_filtered_1["title"].count()
-            st.metric(label="📹 Total Video Published", value=f"{ttl_video:,}")
-        with col2:
-            ttl_duration = df_filtered_1["duration"].sum()
-            st.metric(label="⏳ Total Video Duration (second)", value=f"{ttl_duration:,}")
-        with col3: 
-            ttl_view = df_filtered_1["views"].sum()
-            st.metric(label="👁️ Total Number of Views", value=f"{ttl_view:,}")
-
-        # plot1: top view per day
-        if options_date and options_channel:
-            mask = df_gaming["publishedDate"].between(options_date[0], options_date[1]) &\
-                    df_gaming["channelName"].isin([options_channel])
-            df_filtered_1 = df_gaming[mask]
-
-            df_gaming_1 = df_filtered_1.groupby(["publishedDate", "channelName"])["views"].mean().reset_index()
-            g1 = px.line(df_gaming_1,
-                        x= "publishedDate",
-                        y= "views",
-                        title = "Top View Per Day",
-                        markers = True,
-                        color_discrete_sequence=px.colors.qualitative.Pastel)
-            g1.add_hline(y=overall_avg, 
-                         line_color="#ec5353",
-                         line_dash="dash",
-                         annotation_text=f"Overall Mean: {overall_avg:.2f}",
-                         annotation_position="top right")
-            st.plotly_chart(g1, use_container_width=True)
-                
-        if options_date and not options_channel:
-            mask = df_gaming["publishedDate"].between(options_date[0], options_date[1])
-            df_filtered_1 = df_gaming[mask]
-
-            df_gaming_1 = df_filtered_1.groupby(["publishedDate"])["views"].mean().reset_index()
-            g1 = px.line(df_gaming_1,
-                            x="publishedDate",
-                            y="views",
-                            title = "Top View Per Day",
-                            markers = True,
-                            color_discrete_sequence=px.colors.qualitative.Pastel)
-            g1.add_hline(y=overall_avg, 
-                            line_color="#ec5353",
-                            line_dash="dash",
-                            annotation_text=f"Overall Mean: {overall_avg:.2f}",
-                            annotation_position="top right")
-            st.plotly_chart(g1, use_container_width=True)
-
-    # Two small graphs
-    if st.session_state.gaming_button:
-        col1, col2 = st.columns([3, 2])
-        # top 10 video per channel
-        with col1:
-            mask = df_gaming["channelName"].isin([options_channel]) &\
-                    df_gaming['duration'].between(min_duration, max_duration) &\
-                    df_gaming['views'].between(min_views, max_views)
-            df_filtered_2 = df_gaming[mask]
-            top_videos = df_filtered_2.sort_values("views", ascending=False).head(10)
-            g2 = px.bar(top_videos, x="views", y="title",
-                        title="🔥 Top 10 Videos by View",
-                        color="title",
-                        color_discrete_sequence = px.colors.qualitative.Pastel)
-            g2.update_layout(showlegend=False)
-            st.plotly_chart(g2, use_container_width=True)
-        
-        with col2:
-            mask = df_gaming["channelName"].isin([options_channel]) &\
-                    df_gaming['duration'].between(min_duration, max_duration) &\
-                    df_gaming['views'].between(min_views, max_views)
-            df_filtered_3 = df_gaming[mask]
-            g3 = px.scatter(df_filtered_3, x="duration", y="views",
-                            title="⏳ Duration vs. Views",
-                            size="views",
-                            color_discrete_sequence = px.colors.qualitative.Pastel)
-            g3.update_layout(showlegend=False)
-            st.plotly_chart(g3, use_container_width=True)
-
-    # table
-    if st.session_state.gaming_button:
-        mask = df_gaming["channelName"].isin([options_channel]) &\
-                df_gaming['duration'].between(min_duration, max_duration) &\
-                df_gaming['views'].between(min_views, max_views)
-        df_filtered_4 = df_gaming[mask].drop(columns=["channelName"])
-
-        st.write('📊 Gaming Video Dataframe')
-        st.dataframe(df_filtered_4)
-
-
-###################################################################### MOVIE #################################################################################
-    with tab3:
-        df_movie["publishedDate"] = pd.to_datetime(df_movie["publishedDate"]).dt.date
-
-        st.title("📽️ Movies")
-        # card
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            ttl_video = df_movie["title"].count()
-            st.metric(label="📹 Total Video Published", value=f"{ttl_video:,}")
-        with col2:
-            ttl_duration = df_movie["duration"].sum()
-            st.metric(label="⏳ Total Video Duration (second)", value=f"{ttl_duration:,}")
-        with col3: 
-            ttl_view = df_movie["views"].sum()
-            st.metric(label="👁️ Total Number of Views", value=f"{ttl_view:,}")
-
-        # line: avg view vs. date
-        df_date = df_movie.groupby("publishedDate")["views"].mean().reset_index(name = "max_views")
-        overall_avg = df_movie["views"].mean()
-        fig = px.line(df_date, x = 'publishedDate', y= 'max_views', title= 'Daily Average Views', color_discrete_sequence=px.colors.qualitative.Pastel)
-        # avg line
-        fig.add_hline(y = overall_avg, line_color="#ec5353", line_dash="dash", annotation_text=f"Overall Mean: {overall_avg:.2f}", annotation_position="top right")
-        st.plotly_chart(fig, use_container_width=True)
+    # button for detailed analysis
+    if st.button(f"Detailed Analysis - {category.name}", key = f"{category.key}_analysis"):
+        activate_tab(f"{category.key}_button")
+
+    if st.session_state[f"{category.key}_button"]:
+        render_detailed_analysis(category, store, part)
+
+
+def range_histogram(category, part, channel, column, full_range, selected):
+    # the channel's videos per bin of column, counted from the range index
+    edges = log_edges(*full_range)
+    if len(edges) < 2:
+        return
+    fig = cached_figure(category, f"{column}_histogram", (part.name, channel, *selected),
+                        lambda: range_histogram_figure(edges, part.channel_index.histogram(column, channel, edges),
+                                                       *selected, title=f"{channel}: videos by {column}"))
+    show_chart(category.key, f"{column}_histogram", fig)
+
+def render_detailed_analysis(category, store, part):
+    agg = part.aggregates
+    overall_avg = agg.overall_mean
+    st.subheader("📈 Channel Analysis")
+    # select date
+    start_date = agg.date_range[0].date()
+    end_date = agg.date_range[1].date()
+    options_date = st.sidebar.date_input("Publish Date",
+                        (start_date, end_date),
+                        start_date, end_date,
+                        key = f"{category.key}_{part.name}_date")
+    # select channel
+    channel_option = sorted(part.channel_index.channels())
+    options_channel = st.sidebar.selectbox(f"📌 {category.label} Channel", channel_option)
+    compare_channels = st.sidebar.multiselect(f"📊 Compare {category.label} Channels", channel_option,
+                                              key = f"{category.key}_{part.name}_compare")
+    # words looked up in the title/description index, every word must match
+    keyword = st.sidebar.text_input(f"🔎 Search {category.label} Videos", key = f"{category.key}_keyword",
+                                    placeholder="words in title or description")
+
+    # views & duration
+    with st.sidebar.expander("More Filtering", expanded=False):
+        min_views, max_views = agg.views_range
+        min_views = st.number_input("Min Views", min_value=min_views, value=min_views)
+        max_views = st.number_input("Max Views", max_value=max_views, value=max_views)
+        range_histogram(category, part, options_channel, "views", agg.views_range, (min_views, max_views))
+
+        min_duration, max_duration = agg.duration_range
+        min_duration = st.number_input("Min Duration (seconds)", min_value=min_duration, value=min_duration)
+        max_duration = st.number_input("Max Duration (seconds)", max_value=max_duration, value=max_duration)
+        range_histogram(category, part, options_channel, "duration", agg.duration_range,
+                        (min_duration, max_duration))
+
+    # evaluate the sidebar filters once for the cards, charts and table
+    # only words of two or more letters/digits are indexed; a keyword without any is no filter
+    search_words = " ".join(tokenize(keyword))
+    if keyword.strip() and not search_words:
+        st.sidebar.caption("🔎 Search words need at least two letters or digits.")
+    query = FilterQuery(options_channel, options_date[0], options_date[1],
+                        min_views, max_views, min_duration, max_duration, search_words)
+    with profiler.span(f"{category.key}/filter"):
+        view = part.filter_engine.evaluate(query)
 
-        # subplots
-        col1, col2 = st.columns(2)
-        # small plot left: 時長
-        with col1:
-            # Top 10 views - Channel
-            df_channelview = df_movie.groupby("channelName")["views"].sum().reset_index(name = "sum_views")
-            df_channelview = df_channelview.sort_values('sum_views', ascending = False)
-            # top10_channels = df_channelview.head(10)  # top 10
-
-            st.subheader("📊 Top Views Channel")
-            max_channels_views = min(len(df_channelview), 20)
-            num_channels_views = st.slider("📏 Number of Movie Channel_views", min_value = 1, max_value = max_channels_views, value = 5)
-            top_channelview = df_channelview.head(num_channels_views)
-
-            fig1 = px.bar(top_channelview, x = "sum_views", y = "channelName", orientation = "h",
-                  labels = {"sum_views": "Total Views", "channelName": "Channel Name"},
-                  title = f"🔥 Channel Video Count Top {num_channels_views}", color="channelName",
-                  color_discrete_sequence = px.colors.qualitative.Pastel)
-            fig1.update_layout(showlegend=False)
-            st.plotly_chart(fig1, use_container_width=True)
-
-        with col2:
-            channel_video_counts = df_movie['channelName'].value_counts().reset_index(name = 'video_count')
-            
-            st.subheader("📊 Top Video Published Channel")
-            max_channels_count = min(len(channel_video_counts), 20)
-            num_channels_count = st.slider("📏 Number of Movie Channel_count", min_value = 1, max_value = max_channels_count, value = 5)
-            top_channels = channel_video_counts.head(num_channels_count)
-
-            fig2 = px.bar(top_channels, x = "video_count", y = "channelName", orientation = "h",
-                  labels = {"video_count": "Count", "channelName": "Channel Name"},
-                  title = f"🔥 Channel Video Count Top {num_channels_count}", color="channelName",
-                  color_discrete_sequence = px.colors.qualitative.Pastel)
-            fig2.update_layout(showlegend=False)
-            st.plotly_chart(fig2, use_container_width=True)
-
-        ####################################################################################
-        # button 
-        # def click_button():
-            #st.session_state.movies_button = True
-        # button for detailed nalysis
-        # st.button('Detailed Analysis', on_click=click_button)
-
-        # 🚀 Movies Tab 按鈕
-        if st.button("Detailed Analysis - Movies", key = "movies_analysis"):
-            activate_tab("movies_button")
-            st.session_state.movies_button = True
-            st.session_state.gaming_button = False  # 確保 Gaming 相關內容關閉
-            st.session_state.music_button = False
-
-        if st.session_state.movies_button:
-            st.subheader("📈 Channel Analysis")
-             # select date
-            start_date = df_movie["publishedDate"].min()
-            end_date = df_movie["publishedDate"].max()
-            options_date = st.sidebar.date_input("Publish Date",
-                                (start_date, end_date),
-                                start_date, end_date,
-                                key = 'movie_date')
-            # select channel
-            channel_list = sorted(df_movie['channelName'].unique()) 
-            selected_channels = st.sidebar.selectbox("📌 Movie Channel", channel_list)
-
-            # Display a message
-            # st.write('Movies Trending Video DataFrame')
-            # Generate a dataframe and display it in the app
-            # st.dataframe(df_movie.head(10))
-
-            # views & duration
-            with st.sidebar.expander("More Filtering", expanded=False):
-                min_views = df_movie["views"].min()
-                max_views = df_movie["views"].max()
-                min_views = st.number_input("Min Views", min_value=int(min_views), value=int(min_views))
-                max_views = st.number_input("Max Views", max_value=int(max_views), value=int(max_views))
-
-                min_duration = df_movie["duration"].min()
-                max_duration = df_movie["duration"].max()
-                min_duration = st.number_input("Min Duration (seconds)", min_value=int(min_duration), value=int(min_duration))
-                max_duration = st.number_input("Max Duration (seconds)", max_value=int(max_duration), value=int(max_duration))
-
-            # card
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                mask = df_movie["publishedDate"].between(options_date[0], options_date[1]) & df_movie["channelName"].isin([selected_channels])      
-                df_filtered_1 = df_movie[mask]
-                ttl_video = df_filtered_1["title"].count()
-                st.metric(label="📹 Total Video Published", value=f"{ttl_video:,}")
-            with col2:
-                ttl_duration = df_filtered_1["duration"].sum()
-                st.metric(label="⏳ Total Video Duration (second)", value=f"{ttl_duration:,}")
-            with col3: 
-                ttl_view = df_filtered_1["views"].sum()
-                st.metric(label="👁️ Total Number of Views", value=f"{ttl_view:,}")
-
-            # plot1: top view per day
-            if options_date and selected_channels:
-                mask = df_movie["publishedDate"].between(options_date[0], options_date[1]) &\
-                        df_movie["channelName"].isin([selected_channels])
-                df_filtered_1 = df_movie[mask]
-
-                df_movie_1 = df_filtered_1.groupby(["publishedDate", "channelName"])["views"].mean().reset_index()
-                fig3 = px.line(df_movie_1,
-                            x = "publishedDate",
-                            y = "views",
-                            title = "Top View Per Day",
-                            markers = True,
-                            color_discrete_sequence=px.colors.qualitative.Pastel)
-                fig3.add_hline(y = overall_avg, 
-                            line_color = "#ec5353",
-                            line_dash = "dash",
-                            annotation_text = f"Overall Mean: {overall_avg:.2f}",
-                            annotation_position = "top right")
-                st.plotly_chart(fig3, use_container_width=True)
-                    
-            if options_date and not selected_channels:
-                mask = df_movie["publishedDate"].between(options_date[0], options_date[1])
-                df_filtered_1 = df_movie[mask]
-
-                df_movie_1 = df_filtered_1.groupby(["publishedDate"])["views"].mean().reset_index()
-                fig3 = px.line(df_movie_1,
-                                x="publishedDate",
-                                y="views",
-                                title = "Top View Per Day",
-                                markers = True,
-                                color_discrete_sequence=px.colors.qualitative.Pastel)
-                fig3.add_hline(y = overall_avg, 
-                                line_color = "#ec5353",
-                                line_dash = "dash",
-                                annotation_text = f"Overall Mean: {overall_avg:.2f}",
-                                annotation_position = "top right")
-                st.plotly_chart(fig3, use_container_width = True)
-
-        # two small graphs
-        if st.session_state.movies_button:
-            col1, col2 = st.columns([3, 2])
-            # top 10 video per channel
-            with col1:
-                mask = df_movie["channelName"].isin([selected_channels]) &\
-                        df_movie['duration'].between(min_duration, max_duration) &\
-                        df_movie['views'].between(min_views, max_views)
-                df_filtered_2 = df_movie[mask]
-                top_videos = df_filtered_2.sort_values("views", ascending=False).head(10)
-                g2 = px.bar(top_videos, x="views", y="title",
-                            title="🔥 Top 10 Videos by View",
-                            color="title",
-                            color_discrete_sequence = px.colors.qualitative.Pastel)
-                g2.update_layout(showlegend=False)
-                st.plotly_chart(g2, use_container_width=True)
-            
-            with col2:
-                mask = df_movie["channelName"].isin([selected_channels]) &\
-                        df_movie['duration'].between(min_duration, max_duration) &\
-                        df_movie['views'].between(min_views, max_views)
-                df_filtered_3 = df_movie[mask]
-                g3 = px.scatter(df_filtered_3, x="duration", y="views",
-                                title="⏳ Duration vs. Views",
-                                size="views",
-                                color_discrete_sequence = px.colors.qualitative.Pastel)
-                g3.update_layout(showlegend=False)
-                st.plotly_chart(g3, use_container_width=True)
-            
-            # table
-            if st.session_state.movies_button:
-                mask = df_movie["channelName"].isin([selected_channels]) &\
-                        df_movie['duration'].between(min_duration, max_duration) &\
-                        df_movie['views'].between(min_views, max_views)
-                df_filtered_4 = df_movie[mask].drop(columns=["channelName"])
-
-                st.write('📊 Movie Video Dataframe')
-                st.dataframe(df_filtered_4)
-
-
-########################################################################### MUSIC ###############################################################################
-
-with tab4:
-    # publishedDate to date
-    df_music["publishedDate"] = pd.to_datetime(df_music["publishedDate"]).dt.date
-
-    st.title("🎵 Music")
     # card
     col1, col2, col3 = st.columns(3)
     with col1:
-        ttl_video = df_music["title"].count()
+        ttl_video = view.in_dates["title"].count()
         st.metric(label="📹 Total Video Published", value=f"{ttl_video:,}")
     with col2:
-        ttl_duration = df_music["duration"].sum()
+        ttl_duration = view.in_dates["duration"].sum()
         st.metric(label="⏳ Total Video Duration (second)", value=f"{ttl_duration:,}")
     with col3: 
-        ttl_view = df_music["views"].sum()
+        ttl_view = view.in_dates["views"].sum()
         st.metric(label="👁️ Total Number of Views", value=f"{ttl_view:,}")
 
+    # plot1: top view per day (per week/month for long date ranges)
+    freq, _, unit, _ = choose_resolution(options_date[0], options_date[1])
+    def build_top_view_per_day():
+        series = mean_views_per_bucket(view.in_dates, freq, by=["channelName"])
+        return top_view_per_day_figure(series, overall_avg, title=f"Top View Per {unit}")
+    # only the date part of the query and the keyword change this chart
+    g1 = cached_figure(category, "top_view_per_day", (part.name, *query[:3], query.keyword),
+                       build_top_view_per_day)
+    show_chart(category.key, "top_view_per_day", g1)
+
+    # compare several channels in one chart, all series come from one groupby
+    if compare_channels:
+        compared = tuple(compare_channels)
+        def build_comparison():
+            rows = part.filter_engine.compare(compared, options_date[0], options_date[1], query.keyword)
+            series = mean_views_per_bucket(rows, freq, by=["channelName"])
+            return channel_comparison_figure(series, title=f"Channel Comparison (Average Views Per {unit})")
+        g_compare = cached_figure(category, "channel_comparison",
+                                  (part.name, compared, *query[1:3], query.keyword), build_comparison)
+        show_chart(category.key, "channel_comparison", g_compare)
+
+    # videos mentioning the keyword across all channels of the category
+    if query.keyword:
+        def build_keyword_trend():
+            daily = store.text_index().daily_counts(query.keyword, day_number(options_date[0]),
+                                                    day_number(options_date[1]), rows=part.rows)
+            return keyword_trend_figure(videos_per_bucket(daily, freq),
+                                        title=f"Keyword Trend: {query.keyword} (Videos Per {unit}, All Channels)")
+        g_keyword = cached_figure(category, "keyword_trend", (part.name, query.keyword, *query[1:3]),
+                                  build_keyword_trend)
+        show_chart(category.key, "keyword_trend", g_keyword)
+
+    # keywords of the selected channel
+    keywords = get_keywords(category.path)
+    if keywords is not None:
+        top_terms = keywords.channels[keywords.channels["channelName"] == options_channel]
+        g_terms = cached_figure(category, "channel_keywords", options_channel,
+                                lambda: keyword_bar_figure(top_terms, title=f"🔤 Top Keywords of {options_channel}"))
+        show_chart(category.key, "channel_keywords", g_terms)
 
-    # line: avg view vs. date
-    df_music_1 = df_music.groupby("publishedDate")["views"].mean().reset_index()
-    overall_avg = df_music["views"].mean()
-    g1 = px.line(df_music_1,
-                x="publishedDate",
-                y="views", 
-                title="Monthly Average View",
-                color_discrete_sequence=px.colors.qualitative.Pastel)
-    # avg line
-    g1.add_hline(y = overall_avg, 
-                line_color = "#ec5353",
-                line_dash = "dash",
-                annotation_text = f"Overall Mean: {overall_avg:.2f}",
-                annotation_position = "top right")
-    st.plotly_chart(g1, use_container_width=True)
+    # Two small graphs
+    col1, col2 = st.columns([3, 2])
+    # top 10 video per channel
+    with col1:
+        g2 = cached_figure(category, "top_videos", (part.name, query),
+                           lambda: top_videos_figure(top_k(view.in_ranges, "views", 10)))
+        show_chart(category.key, "top_videos", g2)
+    
+    with col2:
+        g3 = cached_figure(category, "duration_views", (part.name, query),
+                           lambda: duration_views_figure(view.in_ranges))
+        show_chart(category.key, "duration_views", g3)
+
+    # predicted views of the filtered videos, scored in one call
+    model = store.model()
+    def build_predicted_views():
+        rows = view.in_ranges
+        scored = pd.DataFrame({"title": rows["title"], "views": rows["views"], "predicted": model.predict(rows)})
+        return predicted_views_figure(scored)
+    g4 = cached_figure(category, "predicted_views", (part.name, query), build_predicted_views)
+    show_chart(category.key, "predicted_views", g4)
+    st.caption(f"Ridge regression on duration, shorts, publish weekday/month and channel averages "
+               f"(log views, R² {model.r2:.2f} on {HOLDOUT_SHARE:.0%} of the {category.label.lower()} videos, "
+               f"held out of the fit).")
 
+    # table
+    st.write(f'📊 {category.label} Video Dataframe')
+    render_video_table(category, view.in_ranges.drop(columns=["channelName"]))
 
-    # subplots
-    col1, col2 = st.columns(2)
 
-    # small plot left: 時長
+def render_video_table(category, df):
+    # sorted server-side, only the visible page is sent to the browser
+    columns = ["title", "description", *df.columns.drop("title")]
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
     with col1:
-            # Top 10 views - Channel
-            df_music_2 = df_music.groupby("channelName")["views"].sum().reset_index()
-            df_music_2 = df_music_2.sort_values("views", ascending=False)
-
-            st.subheader("📊 Top Views Channel")
-            max_channels_views_music = min(len(df_music_2), 20)
-            num_channels_views_music = st.slider("📏 Number of Music Channel_views", min_value = 1, max_value = max_channels_views_music, value = 5)
-            top_channelview = df_music_2.head(num_channels_views_music)
-
-            g2 = px.bar(top_channelview, x = "views", y = "channelName", orientation = "h",
-                  labels = {"views": "Total Views", "channelName": "Channel Name"},
-                  title = f"🔥 Channel Video Count Top {num_channels_views_music}", color="channelName",
-                  color_discrete_sequence = px.colors.qualitative.Pastel)
-            g2.update_layout(showlegend=False)
-            st.plotly_chart(g2, use_container_width=True)
-
+        shown = st.multiselect("Columns", columns, default=columns, key=f"{category.key}_table_columns")
     with col2:
-        df_music_3 = df_music["channelName"].value_counts().reset_index()
-        df_music_3 = df_music_3.sort_values("count", ascending=False)
-        df_music_3 = df_music_3.rename(columns={"count":"Num of Video"})
-
-        st.subheader("📊 Top Video Published Channel")
-        max_channels_count_music = min(len(df_music_3), 20)
-        num_channels_count_music = st.slider("📏 Number of Music Channel_count", min_value = 1, max_value = max_channels_count_music, value = 5)
-        top_channels = df_music_3.head(num_channels_count_music)
-
-        g3 = px.bar(top_channels, x = "Num of Video", y = "channelName", orientation = "h",
-                labels = {"Num of Video": "Count", "channelName": "Channel Name"},
-                title = f"🔥 Channel Video Count Top {num_channels_count_music}", color="channelName",
-                color_discrete_sequence = px.colors.qualitative.Pastel)
-        g3.update_layout(showlegend=False)
-        st.plotly_chart(g3, use_container_width = True)
+        sort_by = st.selectbox("Sort by", [None, *df.columns], format_func=lambda c: c or "—",
+                               key=f"{category.key}_table_sort")
+        descending = st.toggle("Descending", value=True, key=f"{category.key}_table_desc")
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{category.key}_table_page_size")
+    with col4:
+        n_pages = page_count(len(df), page_size)
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, key=f"{category.key}_table_page")
+
+    with profiler.span(f"{category.key}/table/page"):
+        df_page = get_page(df, min(page, n_pages), page_size, sort_by, ascending=not descending)
+        # publish dates are shown without the time of day
+        df_page = df_page.assign(publishedDate=df_page["publishedDate"].dt.date)
+        if "description" in shown:
+            df_page = with_description(df_page, category.path)
+            if not st.toggle("Show full description", key=f"{category.key}_table_full_description"):
+                df_page["description"] = truncate(df_page["description"])
+    with profiler.span(f"{category.key}/table/dataframe"):
+        st.dataframe(df_page[shown])
+    start = (min(page, n_pages) - 1) * page_size
+    st.caption(f"Rows {min(start + 1, len(df)):,}–{start + len(df_page):,} of {len(df):,}")
+
+
+######################################################################## ALL CATEGORIES ######################################################################
+def render_all_categories():
+    unified, versions = get_unified()
+    aggregates = [load_store(category.path).aggregates for category in CATEGORIES]
+
+    st.title("🌐 All Categories")
 
-    ####################################################################################
-    # button 
-    # def click_button():
-        # st.session_state.gaming_button = True
-    # button for detailed nalysis
-    # st.button('Detailed Analysis', on_click=click_button)
-    # 🚀 Music Tab 按鈕
-    if st.button("Detailed Analysis - Music", key = "music_analysis"):
-        activate_tab("music_button")
-        st.session_state.music_button = True
-        st.session_state.gaming_button = False
-        st.session_state.movies_button = False  # 確保 Movies 相關內容關閉
-
-    if st.session_state.music_button:
-        st.subheader("📈 Channel Analysis")
-        # select date
-        start_date = df_music["publishedDate"].min()
-        end_date = df_music["publishedDate"].max()
-        options_date = st.sidebar.date_input("Publish Date",
-                            (start_date, end_date),
-                            start_date,
-                            end_date,
-                            key = 'music_date')
-        # select channel
-        df_music_uni_channel = df_music.drop_duplicates("channelName")
-        channel_option = df_music_uni_channel.sort_values("channelName", ascending=True)["channelName"]
-        options_channel = st.sidebar.selectbox("📌 Music Channel", channel_option)
-
-        # Display a message
-        # st.write('Music Trending Video DataFrame')
-        # Generate a dataframe and display it in the app
-        # st.dataframe(df_music.head(10))
-
-        # views & duration
-        with st.sidebar.expander("More Filtering", expanded=False):
-            min_views = df_music["views"].min()
-            max_views = df_music["views"].max()
-            min_views = st.number_input("Min Views", min_value=int(min_views), value=int(min_views))
-            max_views = st.number_input("Max Views", max_value=int(max_views), value=int(max_views))
-
-            min_duration = df_music["duration"].min()
-            max_duration = df_music["duration"].max()
-            min_duration = st.number_input("Min Duration (seconds)", min_value=int(min_duration), value=int(min_duration))
-            max_duration = st.number_input("Max Duration (seconds)", max_value=int(max_duration), value=int(max_duration))
-
-        # card
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            mask = df_music["publishedDate"].between(options_date[0], options_date[1]) & df_music["channelName"].isin([options_channel])      
-            df_filtered_1 = df_music[mask]
-            ttl_video = df_filtered_1["title"].count()
-            st.metric(label="📹 Total Video Published", value=f"{ttl_video:,}")
-        with col2:
-            ttl_duration = df_filtered_1["duration"].sum()
-            st.metric(label="⏳ Total Video Duration (second)", value=f"{ttl_duration:,}")
-        with col3: 
-            ttl_view = df_filtered_1["views"].sum()
-            st.metric(label="👁️ Total Number of Views", value=f"{ttl_view:,}")
-
-        # plot1: top view per day
-        if options_date and options_channel:
-            mask = df_music["publishedDate"].between(options_date[0], options_date[1]) &\
-                    df_music["channelName"].isin([options_channel])
-            df_filtered_1 = df_music[mask]
-
-            df_music_1 = df_filtered_1.groupby(["publishedDate", "channelName"])["views"].mean().reset_index()
-            g1 = px.line(df_music_1,
-                        x= "publishedDate",
-                        y= "views",
-                        title = "Top View Per Day",
-                        markers = True,
-                        color_discrete_sequence=px.colors.qualitative.Pastel)
-            g1.add_hline(y=overall_avg, 
-                         line_color="#ec5353",
-                         line_dash="dash",
-                         annotation_text=f"Overall Mean: {overall_avg:.2f}",
-                         annotation_position="top right")
-            st.plotly_chart(g1, use_container_width=True)
-                
-        if options_date and not options_channel:
-            mask = df_music["publishedDate"].between(options_date[0], options_date[1])
-            df_filtered_1 = df_music[mask]
-
-            df_music_1 = df_filtered_1.groupby(["publishedDate"])["views"].mean().reset_index()
-            g1 = px.line(df_music_1,
-                            x="publishedDate",
-                            y="views",
-                            title = "Top View Per Day",
-                            markers = True,
-                            color_discrete_sequence=px.colors.qualitative.Pastel)
-            g1.add_hline(y=overall_avg, 
-                            line_color="#ec5353",
-                            line_dash="dash",
-                            annotation_text=f"Overall Mean: {overall_avg:.2f}",
-                            annotation_position="top right")
-            st.plotly_chart(g1, use_container_width=True)
-
-    # two small graphs
-    if st.session_state.music_button:
-        col1, col2 = st.columns([3, 2])
-        # top 10 video per channel
-        with col1:
-            mask = df_music["channelName"].isin([options_channel]) &\
-                    df_music['duration'].between(min_duration, max_duration) &\
-                    df_music['views'].between(min_views, max_views)
-            df_filtered_2 = df_music[mask]
-            top_videos = df_filtered_2.sort_values("views", ascending=False).head(10)
-            g2 = px.bar(top_videos, x="views", y="title",
-                        title="🔥 Top 10 Videos by View",
-                        color="title",
-                        color_discrete_sequence = px.colors.qualitative.Pastel)
-            g2.update_layout(showlegend=False)
-            st.plotly_chart(g2, use_container_width=True)
-        
-        with col2:
-            mask = df_music["channelName"].isin([options_channel]) &\
-                    df_music['duration'].between(min_duration, max_duration) &\
-                    df_music['views'].between(min_views, max_views)
-            df_filtered_3 = df_music[mask]
-            g3 = px.scatter(df_filtered_3, x="duration", y="views",
-                            title="⏳ Duration vs. Views",
-                            size="views",
-                            color_discrete_sequence = px.colors.qualitative.Pastel)
-            g3.update_layout(showlegend=False)
-            st.plotly_chart(g3, use_container_width=True)
+    # card
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="📹 Total Video Published", value=f"{sum(agg.total_videos for agg in aggregates):,}")
+    with col2:
+        st.metric(label="⏳ Total Video Duration (second)", value=f"{sum(agg.total_duration for agg in aggregates):,}")
+    with col3:
+        st.metric(label="👁️ Total Number of Views", value=f"{sum(agg.total_views for agg in aggregates):,}")
 
+    # totals per category
+    col1, col2 = st.columns(2)
+    with col1:
+        g1 = lookup_figure(("all", "category_views", None, versions),
+                           lambda: category_totals_figure(unified.group_by("category"), "views", "Total Views"))
+        show_chart("all", "category_views", g1)
+    with col2:
+        g2 = lookup_figure(("all", "category_counts", None, versions),
+                           lambda: category_totals_figure(unified.group_by("category", how="size")
+                                                          .rename(columns={"views": "count"}), "count", "Videos"))
+        show_chart("all", "category_counts", g2)
 
-    # table
-    if st.session_state.music_button:
-        mask = df_music["channelName"].isin([options_channel]) &\
-                df_music['duration'].between(min_duration, max_duration) &\
-                df_music['views'].between(min_views, max_views)
-        df_filtered_4 = df_music[mask].drop(columns=["channelName"])
+    # top channels over all categories, split by the category of their videos
+    num_channels = st.slider("📏 Number of Channels", min_value=1, max_value=20, value=10, key="all_channels")
+    def build_top_channels():
+        top = unified.top_k(num_channels, by="channelName")["channelName"]
+        return top_channels_figure(unified.group_by(["channelName", "category"], channels=top.tolist()))
+    g3 = lookup_figure(("all", "top_channels", num_channels, versions), build_top_channels)
+    show_chart("all", "top_channels", g3)
 
-        st.write('📊 Music Video Dataframe')
-        st.dataframe(df_filtered_4)
+    g4 = lookup_figure(("all", "top_videos", None, versions), lambda: top_videos_figure(unified.top_k(10)))
+    show_chart("all", "top_videos", g4)
 
 
 ########################################################################### IMPROVEMENT #######################################################################
-with tab5:
+def render_improvement():
     st.title("🛠️ Opportunities for Dashboard Enhancement")
 
     st.markdown("""
@@ -760,3 +524,95 @@ with tab5:
     When switching between tabs, the sidebar currently retains filters from previous tabs. 
     Future iterations should dynamically clear or update sidebar components to match the active tab.
     """)
+
+
+########################################################################### DIAGNOSTICS #######################################################################
+def render_diagnostics():
+    with st.sidebar.expander("⏱️ Diagnostics", expanded=False):
+        st.write(f"Reruns: {profiler.reruns}, last: {profiler.last_rerun.get('rerun', 0.0) * 1000:.1f} ms")
+        st.dataframe(profiler.summary(), hide_index=True)
+        st.write("Figure cache", get_figure_cache().stats())
+        # everything a store holds: frame columns, then what is derived from them (0 until built)
+        st.write("Memory (KiB)")
+        memory = pd.DataFrame({category.name: load_store(category.path).memory_usage() for category in CATEGORIES})
+        memory.loc["total"] = memory.sum()
+        st.dataframe(memory.div(1024).round(1))
+        st.caption("All Categories queries these stores in place and holds no copy of them.")
+        for category in CATEGORIES:
+            st.write(f"{category.name} filter cache", load_store(category.path).filter_engine.cache_info()._asdict())
+        st.write(f"Warm-up ({get_warmup().elapsed:.2f} s)")
+        st.dataframe(get_warmup().report(), hide_index=True)
+        st.download_button("Download trace (Chrome format)", profiler.chrome_trace(),
+                           file_name="dashboard-trace.json", mime="application/json")
+
+
+########################################################################### WARM-UP ###########################################################################
+# the warm-up thread times into its own disabled profiler, never into a session's
+WARMUP_SPANS = Profiler(enabled=False)
+
+def warm_overview(category):
+    # the figures a first visit of the category tab shows
+    part = load_store(category.path).partition("all")
+    average_views_chart(category, part, WARMUP_SPANS)
+    channel_views_chart(category, part, min(DEFAULT_TOP_CHANNELS, len(part.aggregates.channel_views)), WARMUP_SPANS)
+    channel_counts_chart(category, part, min(DEFAULT_TOP_CHANNELS, len(part.aggregates.channel_counts)), WARMUP_SPANS)
+
+def warm_keywords(category):
+    # waits for the background keyword extraction
+    keywords = keyword_job(category.path, file_signature(category.path)).result()
+    keywords_chart(category, keywords, WARMUP_SPANS)
+
+# started by the first script run of the server process, in a background thread;
+# the steps that wait for keyword extraction come last so they hold up nothing else
+@st.cache_resource(show_spinner=False)
+def get_warmup():
+    steps = []
+    for category in CATEGORIES:
+        steps += [(f"{category.key}/store", lambda category=category: load_store(category.path)),
+                  (f"{category.key}/overview", lambda category=category: warm_overview(category))]
+    steps.append(("all/unified", get_unified))
+    for category in CATEGORIES:
+        steps.append((f"{category.key}/model", lambda category=category: load_store(category.path).model()))
+    # text indexes need the descriptions in memory, by default they are built on the first keyword search;
+    # DASHBOARD_WARM_TEXT=1 builds them up front
+    if os.environ.get("DASHBOARD_WARM_TEXT") == "1":
+        for category in CATEGORIES:
+            steps.append((f"{category.key}/text_index",
+                          lambda category=category: load_store(category.path).text_index()))
+    for category in CATEGORIES:
+        steps.append((f"{category.key}/keywords", lambda category=category: warm_keywords(category)))
+    return Warmup(steps)
+
+warmup = get_warmup()
+if not warmup.ready:
+    st.sidebar.caption(f"⏳ Warming up: {warmup.done}/{len(warmup.steps)} steps ({warmup.elapsed:.1f} s)")
+elif warmup.errors:
+    st.sidebar.caption(f"⚠️ Warm-up finished with {len(warmup.errors)} failed steps ({warmup.elapsed:.1f} s)")
+else:
+    st.sidebar.caption(f"✅ Ready, warmed up in {warmup.elapsed:.1f} s")
+
+
+##############################################################################################################################################################
+with profiler.rerun():
+    if is_open(tab_intro):
+        with tab_intro, profiler.span("introduction"):
+            render_introduction()
+
+    for category, tab in zip(CATEGORIES, category_tabs):
+        if is_open(tab):
+            with tab:
+                render_category(category)
+
+    if is_open(tab_all):
+        with tab_all:
+            render_all_categories()
+
+    if is_open(tab_improvement):
+        with tab_improvement:
+            render_improvement()
+
+if profiler.enabled:
+    render_diagnostics()
+    # DASHBOARD_TRACE_DIR: keep a trace file per session, rewritten after every rerun
+    if os.environ.get("DASHBOARD_TRACE_DIR"):
+        profiler.write_trace(os.path.join(os.environ["DASHBOARD_TRACE_DIR"], f"trace-{id(profiler)}.json"))
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# returned by span() while profiling is off, so a disabled span costs one call
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    """
+    Named timing spans of one session.
+
+    Spans nest; each finished span adds to the per-name totals and, for the
+    trace export, to a bounded list of events in Chrome trace format
+    (open it in chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __init__(self, enabled=False, max_events=100_000):
+        self.enabled = enabled
+        self.reruns = 0
+        self.last_rerun = {}
+        # name -> [calls, total seconds, max seconds]
+        self.totals = {}
+        self.events = deque(maxlen=max_events)
+        self._origin = time.perf_counter()
+
+    def span(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            total = self.totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += elapsed
+            total[2] = max(total[2], elapsed)
+            self.last_rerun[name] = self.last_rerun.get(name, 0.0) + elapsed
+            self.events.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                                "ts": (start - self._origin) * 1e6, "dur": elapsed * 1e6})
+
+    def rerun(self):
+        """Span around one script run; resets the per-rerun timings."""
+        if not self.enabled:
+            return _DISABLED
+        self.reruns += 1
+        self.last_rerun = {}
+        return self._span("rerun")
+
+    def summary(self):
+        rows = [(name, calls, total * 1000, total / calls * 1000, longest * 1000,
+                 self.last_rerun.get(name, 0.0) * 1000)
+                for name, (calls, total, longest) in self.totals.items()]
+        return (pd.DataFrame(rows, columns=["span", "calls", "total_ms", "mean_ms", "max_ms", "last_rerun_ms"])
+                .sort_values("total_ms", ascending=False, ignore_index=True))
+
+    def chrome_trace(self):
+        return json.dumps({"traceEvents": list(self.events), "displayTimeUnit": "ms"})
+
+    def write_trace(self, path):
+        with open(path, "w") as f:
+            f.write(self.chrome_trace())
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from timeseries import day_number
+
+# how partial results of the categories are combined per group in UnifiedStore.group_by
+COMBINE = {"sum": "sum", "size": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def top_positions(values, k):
+    """Positions of the k largest values, largest first, without sorting all values."""
+    if len(values) > k:
+        candidates = np.argpartition(values, len(values) - k)[len(values) - k:]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind="stable")]
+
+
+def top_k(df, column, k):
+    """The k rows of df with the largest values of column, largest first, without sorting all rows."""
+    return df.iloc[top_positions(df[column].to_numpy(), k)]
+
+
+class UnifiedStore:
+    """
+    All category stores behind one query API, with a dictionary-encoded
+    `category` column in the results.
+
+    The stores' frames are not copied: every method takes the same keyword
+    filters as positions(), which resolves them per category to row
+    positions of that category's frame: is_short picks its shorts/long
+    partition, channels are spans of the partition's channel index and
+    views/duration/date ranges are intervals of its range indexes (per
+    channel, or over the whole partition). Only the per-category partial
+    results of group_by/top_k are combined.
+    """
+
+    def __init__(self, stores):
+        # stores: category name -> CategoryStore; its frame and partitions at this version
+        self.parts = {name: (store.frame, dict(store.partitions)) for name, store in stores.items()}
+
+    def positions(self, category, channels=None, start_date=None, end_date=None,
+                  views=None, duration=None, is_short=None):
+        """
+        Sorted positions of the category's rows matching every given filter,
+        None for all rows: channels is a list of names, views/duration
+        (min, max) tuples, dates inclusive.
+        """
+        part = self.parts[category][1]["all" if is_short is None else "shorts" if is_short else "long"]
+        index = part.channel_index
+        bounds = {column: bound for column, bound in (("views", views), ("duration", duration)) if bound is not None}
+        if start_date is not None or end_date is not None:
+            bounds["days"] = (day_number(start_date) if start_date is not None else np.iinfo("int64").min,
+                              day_number(end_date) if end_date is not None else np.iinfo("int64").max)
+        if channels is not None:
+            # the channels' spans, narrowed by their per-channel ranges
+            selected = [index.select(*index.span(channel), bounds) for channel in set(channels)]
+            return np.sort(np.concatenate([index.order[0:0], *selected]))
+        # intervals of the ranges over the whole partition
+        rows = index.select_all(bounds)
+        return part.rows if rows is None else rows
+
+    def _selections(self, categories=None, **filters):
+        # (category, frame, positions or None) of every category, no positions when it isn't selected
+        return [(name, frame, self.positions(name, **filters) if categories is None or name in categories
+                 else np.arange(0)) for name, (frame, _) in self.parts.items()]
+
+    def _combine(self, frames):
+        # frames: category name -> frame; concatenated with channelName and category dictionary-encoded
+        names = list(self.parts)
+        parts = list(frames.values())
+        combined = pd.concat(parts, ignore_index=True)
+        if "channelName" in combined:
+            channels = union_categoricals([part["channelName"].astype("category") for part in parts])
+            combined["channelName"] = pd.Categorical.from_codes(channels.codes, dtype=channels.dtype)
+        combined["category"] = pd.Categorical.from_codes(
+            np.repeat([names.index(name) for name in frames], [len(part) for part in parts]),
+            categories=names)
+        return combined
+
+    def group_by(self, by, column="views", how="sum", **filters):
+        """
+        column aggregated with how per group of the by columns, as a frame.
+        Every category is aggregated on its own; unless by includes
+        "category", the partial results are combined, so how must be one
+        of COMBINE.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        keys = [key for key in by if key != "category"]
+        if "category" not in by and how not in COMBINE:
+            raise ValueError(f"{how!r} can't be combined over categories, group by category too")
+        partials = {}
+        for name, frame, rows in self._selections(**filters):
+            frame = frame[[*keys, column]]
+            frame = frame if rows is None else frame.iloc[rows]
+            if keys:
+                partials[name] = frame.groupby(keys, observed=True)[column].agg(how).reset_index()
+            elif len(frame):
+                partials[name] = pd.DataFrame({column: [frame[column].agg(how)]})
+        if not partials:
+            return pd.DataFrame(columns=[*by, column])
+        combined = self._combine(partials)
+        # grouped by category too, every group is one partial result; otherwise combine the categories'
+        return combined.groupby(by, observed=True)[column].agg(
+            "first" if "category" in by else COMBINE[how]).reset_index()
+
+    def top_k(self, k, column="views", by=None, **filters):
+        """k rows with the largest column, or the k groups with the largest column total when by is given."""
+        if by is not None:
+            return top_k(self.group_by(by, column, **filters), column, k)
+        # the k largest of every category, then the k largest of those
+        candidates = {}
+        for name, frame, rows in self._selections(**filters):
+            values = frame[column].to_numpy()
+            if rows is not None:
+                values = values[rows]
+            best = top_positions(values, k)
+            candidates[name] = frame.iloc[best if rows is None else rows[best]]
+        return top_k(self._combine(candidates), column, k)
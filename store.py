@@ -0,0 +1,253 @@
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from aggregates import AggregateAccumulator
+from data_loader import (COMPACT_COLUMNS, OVERVIEW_COLUMNS, compact, file_signature, load_category, load_shared,
+                         refresh_snapshot)
+from filters import FilterEngine
+from indexes import ChannelIndex, position_dtype
+from model import ViewModel
+from text_index import TextIndex
+from timeseries import day_numbers
+
+# the store's frames are shared by every session: with copy-on-write (always on from pandas 3)
+# a column assigned on anything derived from them never writes through to the shared data
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# isShort value of the videos in each partition, None for all videos
+PARTITIONS = {"all": None, "shorts": True, "long": False}
+
+
+# the model is refitted once the dataset grew by this share since its fit
+MODEL_REFIT_GROWTH = 0.1
+
+
+def append_rows(df, delta):
+    # keeps channelName categorical; existing category codes don't change.
+    # delta comes labelled with its positions in the store's frame
+    channels = union_categoricals([df["channelName"].iloc[:0], delta["channelName"].astype("category")],
+                                  sort_categories=False).dtype
+    # only the delta is compacted; a count that doesn't fit the compact type of df widens the column
+    delta = compact(delta)
+    dtypes = {column: np.promote_types(df[column].dtype, delta[column].dtype)
+              for column in df.columns.intersection(COMPACT_COLUMNS)}
+    # both sides of the concat must have the same categories, or channelName comes out as strings
+    dtypes["channelName"] = channels
+    delta = delta.astype({**{column: df[column].dtype for column in df.columns}, **dtypes})
+    return pd.concat([df.astype(dtypes), delta])
+
+
+def _deep_bytes(data):
+    # memory of a Series or DataFrame, strings included
+    return int(np.sum(data.memory_usage(deep=True)))
+
+
+def partition_rows(frame, is_short):
+    # sorted positions of the partition's rows in frame
+    return np.flatnonzero(frame["isShort"].to_numpy() == is_short).astype(position_dtype(len(frame)))
+
+
+class Partition:
+    """
+    Videos of a store with one isShort value (or all of them): their row
+    positions in the store's frame, with aggregates, channel index and
+    filter engine. Nothing is copied out of the frame.
+    """
+
+    def __init__(self, name, rows, accumulator, channel_index, filter_engine):
+        self.name = name
+        # sorted positions of the rows in the store's frame, None for all rows
+        self.rows = rows
+        self.accumulator = accumulator
+        self.aggregates = accumulator.result()
+        self.channel_index = channel_index
+        self.filter_engine = filter_engine
+
+    @property
+    def empty(self):
+        if self.rows is None:
+            return len(self.channel_index.frame) == 0
+        return len(self.rows) == 0
+
+    def renamed(self, name):
+        # the same rows under another name, sharing everything
+        part = copy.copy(self)
+        part.name = name
+        return part
+
+
+class CategoryStore:
+    """
+    A category dataset with everything derived from it: aggregates,
+    channel index and filter engine, for all videos and for the shorts
+    and long-form partitions (see PARTITIONS). There is one frame; the
+    partitions and indexes hold row positions into it, and a partition
+    with every row is the "all" partition under another name.
+
+    refresh() follows changes of the csv. Rows appended to the csv are
+    parsed and merged on their own; any other change reloads everything.
+    `version` increases on every change, use it in cache keys of things
+    computed from the store.
+
+    descriptions(), text_index() and model() are built on first use and
+    kept across appends: the new rows are added to the first two, the
+    model is refitted once enough rows were appended.
+    Everything published by the store is shared and read-only. With
+    mmap=True the frame is memory-mapped from an Arrow file so several
+    server processes share it too (until rows are appended).
+    """
+
+    def __init__(self, path, mmap=False):
+        self.path = path
+        self.mmap = mmap
+        self.version = 0
+        self._lock = threading.RLock()
+        with self._lock:
+            self._load(refresh_snapshot(path)[2])
+
+    def _load(self, signature):
+        # signature: of the csv as of the snapshot that is read
+        self.signature = signature
+        if self.mmap:
+            frame = load_shared(self.path, OVERVIEW_COLUMNS)
+        else:
+            frame = load_category(self.path, OVERVIEW_COLUMNS)
+        whole = self._partition("all", None, AggregateAccumulator().add(frame), ChannelIndex(frame))
+        partitions = {"all": whole}
+        for name, is_short in PARTITIONS.items():
+            if is_short is not None:
+                partitions[name] = self._subset(name, frame, partition_rows(frame, is_short), whole)
+        self._publish(frame, partitions)
+        self._descriptions = None
+        self._text_index = None
+        self._model = None
+
+    def _append(self, delta, signature):
+        """
+        Merge rows appended to the csv. Aggregates are added to, and the new
+        rows are inserted into the sorted indexes and the text index; the
+        cost follows the size of the delta, not of the dataset.
+        """
+        self.signature = signature
+        delta = delta.set_axis(pd.RangeIndex(len(self.frame), len(self.frame) + len(delta)))
+        if self._descriptions is not None:
+            self._descriptions = pd.concat([self._descriptions,
+                                            delta["description"].astype(self._descriptions.dtype)])
+        if self._text_index is not None:
+            text = delta["title"].str.cat(delta["description"], sep=" ", na_rep="")
+            self._text_index = self._text_index.extended(text, day_numbers(delta["publishedDate"]))
+        delta = delta[OVERVIEW_COLUMNS]
+        frame = append_rows(self.frame, delta)
+        old = self.partitions["all"]
+        whole = self._partition("all", None, old.accumulator.add(delta),
+                                old.channel_index.extended(frame, delta.index.to_numpy()))
+        partitions = {"all": whole}
+        for name, is_short in PARTITIONS.items():
+            if is_short is None:
+                continue
+            old = self.partitions[name]
+            new = delta[delta["isShort"].to_numpy() == is_short]
+            if old.rows is None:
+                # held every row until now
+                rows = np.concatenate([np.arange(len(self.frame)), new.index.to_numpy()])
+                partitions[name] = self._subset(name, frame, rows.astype(position_dtype(len(frame))), whole)
+            else:
+                rows = np.concatenate([old.rows, new.index.to_numpy()]).astype(position_dtype(len(frame)))
+                partitions[name] = self._partition(name, rows, old.accumulator.add(new),
+                                                   old.channel_index.extended(frame, new.index.to_numpy()))
+        self._publish(frame, partitions)
+
+    def _subset(self, name, frame, rows, whole):
+        # a partition holding every row is the whole store under another name
+        if len(rows) == len(frame):
+            return whole.renamed(name)
+        return self._partition(name, rows, AggregateAccumulator().add(frame.iloc[rows]),
+                               ChannelIndex(frame, rows))
+
+    def _partition(self, name, rows, accumulator, channel_index):
+        # the text index covers the store's frame, so do the index positions of every partition
+        return Partition(name, rows, accumulator, channel_index, FilterEngine(channel_index, search=self._search))
+
+    def _publish(self, frame, partitions):
+        self.frame = frame
+        self.partitions = partitions
+        # the store itself answers for all videos
+        self.aggregates = partitions["all"].aggregates
+        self.channel_index = partitions["all"].channel_index
+        self.filter_engine = partitions["all"].filter_engine
+        self.version += 1
+
+    def partition(self, name):
+        return self.partitions[name]
+
+    def memory_usage(self):
+        """
+        Bytes held by the store: every column of the frame, then the
+        descriptions, partition rows, channel indexes, aggregates, text
+        index and model, 0 for what is not loaded yet. Partitions sharing
+        an object count it once.
+        """
+        with self._lock:
+            parts = list({id(part.channel_index): part for part in self.partitions.values()}.values())
+            held = {
+                "description": _deep_bytes(self._descriptions) if self._descriptions is not None else 0,
+                "partition rows": sum(part.rows.nbytes for part in parts if part.rows is not None),
+                "channel indexes": sum(part.channel_index.nbytes for part in parts),
+                "aggregates": sum(_deep_bytes(data) for part in parts for data in (
+                    part.aggregates.daily, part.aggregates.channel_views, part.aggregates.channel_counts,
+                    part.accumulator.day_views, part.accumulator.day_videos,
+                    part.accumulator.channel_views, part.accumulator.channel_videos)),
+                "text index": self._text_index.nbytes if self._text_index is not None else 0,
+                "model": self._model.nbytes if self._model is not None else 0,
+            }
+            return pd.concat([self.frame.memory_usage(deep=True), pd.Series(held)])
+
+    def descriptions(self):
+        """description column aligned with frame, read on first use."""
+        with self._lock:
+            if self._descriptions is None:
+                self._descriptions = load_category(self.path, ["description"])["description"]
+            return self._descriptions
+
+    def text_index(self):
+        """TextIndex of title and description, extended with appended rows."""
+        with self._lock:
+            if self._text_index is None:
+                text = self.frame["title"].str.cat(self.descriptions(), sep=" ", na_rep="")
+                self._text_index = TextIndex(text, day_numbers(self.frame["publishedDate"]))
+            return self._text_index
+
+    def model(self):
+        """
+        ViewModel trained on the whole dataset. Appended rows are scored by
+        the current model until they make up MODEL_REFIT_GROWTH of the data.
+        """
+        with self._lock:
+            if self._model is None or len(self.frame) > self._model_rows * (1 + MODEL_REFIT_GROWTH):
+                self._model = ViewModel(self.frame)
+                self._model_rows = len(self.frame)
+            return self._model
+
+    def _search(self, keyword):
+        return self.text_index().mask(keyword)
+
+    def refresh(self):
+        """Pick up changes of the csv; True when the dataset changed."""
+        if file_signature(self.path) == self.signature:
+            return False
+        with self._lock:
+            if file_signature(self.path) == self.signature:
+                return False
+            status, delta, signature = refresh_snapshot(self.path, since=self.signature)
+            if status == "pending":
+                return False
+            if status == "appended":
+                self._append(delta, signature)
+            else:
+                self._load(signature)
+            return True
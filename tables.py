@@ -0,0 +1,20 @@
+PAGE_SIZES = [25, 50, 100, 250]
+# descriptions are cut to this many characters unless the full text is requested
+DESCRIPTION_PREVIEW_CHARS = 100
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def get_page(df, page, page_size, sort_by=None, ascending=True):
+    """Rows of the 1-based page of df, optionally sorted by one column first."""
+    if sort_by is not None:
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable")
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def truncate(text, max_chars=DESCRIPTION_PREVIEW_CHARS):
+    long = (text.str.len() > max_chars).fillna(False)
+    return text.where(~long, text.str.slice(0, max_chars) + "…")
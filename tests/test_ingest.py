@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from data_loader import read_snapshot
+from test_store import videos
+
+# growth of the peak resident size allowed for streaming a csv into its snapshot
+INGEST_BOUND = 48 * 2 ** 20
+
+
+def peak_growth(statement, path):
+    # VmHWM of a fresh interpreter running statement, over one with the imports alone
+    def peak(statement):
+        script = ("import sys\n"
+                  "from data_loader import ingest_csv\n"
+                  "path = sys.argv[1]\n"
+                  f"{statement}\n"
+                  "print(open('/proc/self/status').read().split('VmHWM:')[1].split()[0])")
+        output = subprocess.run([sys.executable, "-c", script, str(path)], check=True, capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return int(output.stdout.split()[-1]) * 1024
+    return peak(statement) - peak("pass")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads VmHWM from /proc")
+def test_ingest_peak_memory_does_not_grow_with_the_file(tmp_path):
+    path = tmp_path / "videos.csv"
+    block = videos(1_000, ["alpha", "beta", "gamma"], seed=0)
+    block["description"] = [" ".join(np.random.default_rng(i).choice(list("abcdefgh"), 200)) for i in range(len(block))]
+    block.iloc[:0].to_csv(path, index=False)
+    for _ in range(150):
+        block.to_csv(path, mode="a", header=False, index=False)
+    assert os.path.getsize(path) > INGEST_BOUND
+
+    assert peak_growth("ingest_csv(path, chunk_rows=1_000)", path) < INGEST_BOUND
+    snapshot = read_snapshot(str(path), ["views"])
+    assert len(snapshot) == 150 * len(block)
+    assert snapshot["views"].sum() == 150 * block["views"].sum()
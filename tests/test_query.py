@@ -0,0 +1,76 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from query import UnifiedStore
+from store import CategoryStore
+from test_store import append, videos
+
+FILTERS = [
+    {},
+    {"is_short": True},
+    {"is_short": False},
+    {"channels": ["alpha", "gamma", "nope"]},
+    {"channels": ["nope"]},
+    {"start_date": dt.date(2023, 6, 1), "end_date": dt.date(2024, 2, 29)},
+    {"end_date": dt.date(2023, 3, 31)},
+    {"views": (5_000, 20_000)},
+    {"duration": (100, 10_000), "is_short": False},
+    {"views": (1_000, 25_000), "duration": (0, 15_000), "start_date": dt.date(2023, 9, 1), "is_short": True},
+    {"channels": ["beta"], "views": (10_000, 30_000), "end_date": dt.date(2024, 6, 30)},
+]
+
+
+@pytest.fixture
+def unified(tmp_path):
+    stores = {}
+    for i, name in enumerate(["Gaming", "Movies", "Music"]):
+        path = tmp_path / f"{name.lower()}.csv"
+        videos(200, ["alpha", "beta", "gamma"], seed=i, short_share=0.3).to_csv(path, index=False)
+        stores[name] = CategoryStore(str(path))
+    # the range indexes of an appended store are extended rather than rebuilt
+    append(tmp_path / "music.csv", videos(30, ["beta", "delta"], seed=9, short_share=0.5))
+    assert stores["Music"].refresh()
+    return UnifiedStore(stores)
+
+
+def scan(frame, channels=None, start_date=None, end_date=None, views=None, duration=None, is_short=None):
+    # positions positions() should return, by testing every row
+    mask = np.ones(len(frame), dtype=bool)
+    day = frame["publishedDate"].dt.normalize()
+    if channels is not None:
+        mask &= frame["channelName"].isin(channels).to_numpy()
+    if start_date is not None:
+        mask &= (day >= pd.Timestamp(start_date)).to_numpy()
+    if end_date is not None:
+        mask &= (day <= pd.Timestamp(end_date)).to_numpy()
+    for column, bounds in (("views", views), ("duration", duration)):
+        if bounds is not None:
+            mask &= frame[column].between(*bounds).to_numpy()
+    if is_short is not None:
+        mask &= (frame["isShort"] == is_short).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_positions_match_a_scan(unified, filters):
+    for name, (frame, _) in unified.parts.items():
+        rows = unified.positions(name, **filters)
+        rows = np.arange(len(frame)) if rows is None else rows
+        assert np.array_equal(rows, scan(frame, **filters)), name
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_group_by_and_top_k_match_pandas(unified, filters):
+    frames = [frame.iloc[scan(frame, **filters)].assign(category=name) for name, (frame, _) in unified.parts.items()]
+    combined = pd.concat(frames, ignore_index=True).astype({"channelName": "str"})
+
+    totals = unified.group_by(["channelName", "category"], **filters).astype({"channelName": "str", "category": "str"})
+    expected = combined.groupby(["channelName", "category"])["views"].sum().reset_index()
+    pd.testing.assert_frame_equal(totals.sort_values(["channelName", "category"]).reset_index(drop=True),
+                                  expected, check_dtype=False)
+
+    top = unified.top_k(10, **filters)
+    assert top["views"].tolist() == combined["views"].nlargest(10).tolist()
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import file_signature, ingest_csv, read_snapshot
+from filters import FilterQuery
+from store import CategoryStore
+
+WORDS = ["minecraft", "speedrun", "trailer", "official", "live", "review", "music", "remix"]
+
+
+def videos(n, channels, seed, views=(0, 30_000), duration=(1, 30_000), short_share=0.0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "title": [" ".join(rng.choice(WORDS, 3)) for _ in range(n)],
+        "description": [" ".join(rng.choice(WORDS, 5)) if i % 4 else "" for i in range(n)],
+        "publishedDate": (pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 700 * 86400, n), unit="s"))
+        .strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "channelName": rng.choice(channels, n),
+        "views": rng.integers(*views, n),
+        "duration": rng.integers(*duration, n),
+        "isShort": rng.random(n) < short_share,
+    })
+
+
+def append(path, df):
+    df.to_csv(path, mode="a", header=False, index=False)
+
+
+def assert_same_store(store, fresh):
+    pd.testing.assert_frame_equal(store.frame, fresh.frame, check_categorical=False)
+    assert list(store.frame.dtypes.astype(str)) == list(fresh.frame.dtypes.astype(str))
+    assert store.descriptions().equals(fresh.descriptions())
+    for name in ("all", "shorts", "long"):
+        part, other = store.partition(name), fresh.partition(name)
+        assert part.empty == other.empty
+        if part.empty:
+            continue
+        assert part.aggregates.total_views == other.aggregates.total_views
+        assert part.aggregates.channel_views.equals(other.aggregates.channel_views)
+        index, expected = part.channel_index, other.channel_index
+        assert np.array_equal(index.order, expected.order)
+        for ranges, expected_ranges in ((index.ranges, expected.ranges), (index.overall, expected.overall)):
+            for column in expected_ranges:
+                assert np.array_equal(ranges[column].order, expected_ranges[column].order), (name, column)
+                assert np.array_equal(ranges[column].values, expected_ranges[column].values), (name, column)
+        for channel in expected.channels():
+            for keyword in ("", "minecraft", "official review"):
+                query = FilterQuery(channel, pd.Timestamp("2023-03-01").date(), pd.Timestamp("2024-06-01").date(),
+                                    1_000, 10 ** 12, 10, 20_000, keyword)
+                view, expected_view = part.filter_engine.evaluate(query), other.filter_engine.evaluate(query)
+                assert view.in_dates.index.equals(expected_view.in_dates.index)
+                assert view.in_ranges.index.equals(expected_view.in_ranges.index)
+    index, expected = store.text_index(), fresh.text_index()
+    assert index.n_rows == expected.n_rows
+    assert np.array_equal(index.days, expected.days)
+    assert set(index.terms.to_pylist()) == set(expected.terms.to_pylist())
+    for term in expected.terms.to_pylist():
+        assert np.array_equal(index.postings_of(term), expected.postings_of(term)), term
+
+
+def test_refresh_after_appends_matches_a_fresh_load(tmp_path):
+    path = tmp_path / "videos.csv"
+    # small counts so views and duration start out as int16
+    videos(300, ["alpha", "beta"], seed=0).to_csv(path, index=False)
+    store = CategoryStore(str(path))
+    # built before the appends, so they are extended instead of loaded afresh
+    store.text_index()
+    store.descriptions()
+    assert str(store.frame["views"].dtype) == "int16"
+
+    # a new channel, the first shorts and counts past int16
+    append(path, videos(40, ["beta", "gamma"], seed=1, views=(30_000, 100_000), short_share=0.5))
+    assert store.refresh()
+    assert_same_store(store, CategoryStore(str(path)))
+
+    # views past int32, durations past int16, another new channel
+    append(path, videos(25, ["alpha", "delta"], seed=2, views=(2 ** 31, 2 ** 33), duration=(30_000, 70_000),
+                        short_share=0.3))
+    assert store.refresh()
+    assert str(store.frame["views"].dtype) == "int64"
+    assert_same_store(store, CategoryStore(str(path)))
+    assert len(store.frame) == 365
+
+
+def test_rows_appended_during_an_ingest_are_read_once(tmp_path):
+    path = tmp_path / "videos.csv"
+    videos(200, ["alpha", "beta"], seed=0).to_csv(path, index=False)
+    signature = file_signature(path)
+    append(path, videos(50, ["beta"], seed=1))
+    # the ingest started before the append: it stops at the size it was started with
+    ingest_csv(str(path), signature=signature)
+    assert len(read_snapshot(str(path))) == 200
+
+    store = CategoryStore(str(path))
+    assert len(store.frame) == 250
+    assert_same_store(store, CategoryStore(str(path)))
+
+
+def test_half_written_line_waits_for_its_newline(tmp_path):
+    path = tmp_path / "videos.csv"
+    videos(100, ["alpha"], seed=0).to_csv(path, index=False)
+    store = CategoryStore(str(path))
+    line = videos(1, ["beta"], seed=1).to_csv(header=False, index=False)
+    with open(path, "a") as f:
+        f.write(line[:len(line) // 2])
+    assert not store.refresh()
+    assert len(store.frame) == 100
+
+    with open(path, "a") as f:
+        f.write(line[len(line) // 2:])
+    assert store.refresh()
+    assert len(store.frame) == 101
+    assert_same_store(store, CategoryStore(str(path)))
+
+
+def test_a_snapshot_extended_by_another_store_is_reloaded(tmp_path):
+    path = tmp_path / "videos.csv"
+    videos(100, ["alpha"], seed=0).to_csv(path, index=False)
+    store, other = CategoryStore(str(path)), CategoryStore(str(path))
+    append(path, videos(20, ["beta"], seed=1))
+    assert other.refresh()
+    append(path, videos(10, ["gamma"], seed=2))
+    assert store.refresh()
+    assert len(store.frame) == 130
+    assert_same_store(store, CategoryStore(str(path)))
@@ -0,0 +1,135 @@
+import copy
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# lowercase words of two or more letters/digits, in any script
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _sorted_unique(keys):
+    # np.unique hashes int64 keys on numpy 2.x, sorting and dropping repeats is much faster
+    keys = np.sort(keys)
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+
+def _terms(text):
+    # words of every row, labelled with the row's position in text
+    return (text.reset_index(drop=True).fillna("").str.lower()
+            .str.findall(TOKEN_PATTERN).explode().dropna())
+
+
+class TextIndex:
+    """
+    Inverted index of a dataset's text (title and description).
+
+    Every term maps to the sorted positions of the rows containing it,
+    stored like ChannelIndex: one postings array with an offset per term.
+    The terms are one arrow string array (a term's id is its position),
+    far smaller than a dict of python strings; lookups hash against it.
+    Publish days are kept alongside so matches can be counted per day
+    without going back to the frame.
+    """
+
+    def __init__(self, text, days, maxsize=64):
+        n_rows = max(len(text), 1)
+        terms = _terms(text)
+        codes, vocabulary = pd.factorize(terms.to_numpy())
+        # one entry per (term, row), sorted by term and then row
+        pairs = _sorted_unique(codes.astype("int64") * n_rows + terms.index.to_numpy())
+        term_of_pair = pairs // n_rows
+
+        self.n_rows = len(text)
+        self.days = np.asarray(days, dtype=np.int32)
+        self.postings = (pairs % n_rows).astype("int32")
+        self.offsets = np.searchsorted(term_of_pair, np.arange(len(vocabulary) + 1)).astype("int32")
+        self.terms = pa.array(vocabulary, type=pa.string())
+        self.maxsize = maxsize
+        self.search = lru_cache(maxsize=maxsize)(self._search)
+
+    def extended(self, text, days):
+        """
+        Index also covering rows appended after the indexed ones, with their
+        text and days. Their postings go at the end of each term's (they are
+        the highest positions), new terms after the old ones; only the new
+        rows are tokenized.
+        """
+        n_new = max(len(text), 1)
+        terms = _terms(text)
+        codes, words = pd.factorize(terms.to_numpy())
+        # ids of the distinct words: the old ones, or new ids after them
+        ids = self.term_ids(words)
+        vocabulary = words[ids < 0]
+        ids[ids < 0] = len(self.terms) + np.arange(len(vocabulary))
+        codes = ids[codes]
+        pairs = _sorted_unique(codes * n_new + terms.index.to_numpy())
+        term_of_pair = pairs // n_new
+
+        # new terms start with empty postings at the end
+        offsets = np.concatenate([self.offsets, np.repeat(self.offsets[-1], len(vocabulary))])
+        index = copy.copy(self)
+        index.n_rows = self.n_rows + len(text)
+        index.days = np.concatenate([self.days, np.asarray(days, dtype=np.int32)])
+        index.postings = np.insert(self.postings, offsets[term_of_pair + 1],
+                                   (self.n_rows + pairs % n_new).astype(self.postings.dtype))
+        index.offsets = (offsets + np.concatenate([[0], np.cumsum(np.bincount(term_of_pair, minlength=len(offsets) - 1))])
+                         ).astype(self.offsets.dtype)
+        index.terms = pa.concat_arrays([self.terms, pa.array(vocabulary, type=pa.string())])
+        index.search = lru_cache(maxsize=self.maxsize)(index._search)
+        return index
+
+    @property
+    def nbytes(self):
+        # arrays plus the terms (memoized searches not included)
+        return self.postings.nbytes + self.offsets.nbytes + self.days.nbytes + self.terms.nbytes
+
+    def term_ids(self, words):
+        """ids of words as an int64 array, -1 for the ones not indexed."""
+        ids = pc.index_in(pa.array(words, type=pa.string()), value_set=self.terms)
+        return ids.fill_null(-1).to_numpy().astype("int64")
+
+    def postings_of(self, term):
+        i = self.term_ids([term])[0]
+        if i < 0:
+            return self.postings[0:0]
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def _search(self, query):
+        """Sorted positions of the rows containing every word of query; none when it has no words."""
+        words = tokenize(query)
+        if not words:
+            return self.postings[0:0]
+        # intersect the shortest postings first
+        postings = sorted((self.postings_of(word) for word in set(words)), key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def mask(self, query):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.search(query)] = True
+        return mask
+
+    def daily_counts(self, query, start_day=None, end_day=None, rows=None):
+        """
+        publishedDate (day), videos: matching rows per publish day, optionally
+        within day numbers and among the sorted row positions `rows`.
+        """
+        found = self.search(query)
+        if rows is not None:
+            found = np.intersect1d(found, rows, assume_unique=True)
+        days = self.days[found]
+        if start_day is not None:
+            days = days[(days >= start_day) & (days <= end_day)]
+        days, videos = np.unique(days, return_counts=True)
+        return pd.DataFrame({"publishedDate": days.astype("datetime64[D]").astype("datetime64[us]"),
+                             "videos": videos})
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# time buckets from finest to coarsest: (pandas frequency, adjective, unit, approx. days)
+RESOLUTIONS = [
+    ("D", "Daily", "Day", 1),
+    ("W-MON", "Weekly", "Week", 7),
+    ("MS", "Monthly", "Month", 30.44),
+    ("QS", "Quarterly", "Quarter", 91.31),
+    ("YS", "Yearly", "Year", 365.25),
+]
+# max points sent to the browser per time-series chart
+DEFAULT_POINT_BUDGET = 500
+
+
+def choose_resolution(start, end, max_points=DEFAULT_POINT_BUDGET):
+    """Finest resolution that shows the range [start, end] in at most max_points buckets."""
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for resolution in RESOLUTIONS:
+        if span / resolution[3] <= max_points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+def day_numbers(dates):
+    """Days since 1970-01-01 of a datetime64 column as an int64 array (NaT sorts first)."""
+    return dates.to_numpy().astype("datetime64[D]").view("int64")
+
+
+def day_number(date):
+    # a datetime.date from a widget, or a Timestamp
+    return int(np.datetime64(date, "D").view("int64"))
+
+
+def _bucket(freq):
+    # buckets are labelled with their first day
+    return pd.Grouper(key="publishedDate", freq=freq, label="left", closed="left")
+
+
+def resample_daily(daily, freq):
+    """
+    Mean views per bucket from per-day totals (publishedDate, total_views, videos).
+
+    Weighted by the number of videos, so a week's mean is the mean over its
+    videos and not the mean of its daily means.
+    """
+    if freq == "D":
+        return pd.DataFrame({"publishedDate": daily["publishedDate"],
+                             "views": daily["total_views"] / daily["videos"]})
+    totals = daily.groupby(_bucket(freq))[["total_views", "videos"]].sum()
+    totals = totals[totals["videos"] > 0]
+    return pd.DataFrame({"publishedDate": totals.index,
+                         "views": totals["total_views"] / totals["videos"]}).reset_index(drop=True)
+
+
+def videos_per_bucket(daily, freq):
+    """Videos per publishedDate bucket from per-day counts (publishedDate, videos)."""
+    if freq == "D":
+        return daily
+    return daily.groupby(_bucket(freq))["videos"].sum().reset_index()
+
+
+def mean_views_per_bucket(df, freq, by=()):
+    """Mean views of the rows of df per publishedDate bucket (and per `by` columns)."""
+    df = df.assign(publishedDate=df["publishedDate"].dt.normalize())
+    keys = [_bucket(freq) if freq != "D" else "publishedDate", *by]
+    return df.groupby(keys, observed=True)["views"].mean().reset_index()
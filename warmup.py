@@ -0,0 +1,61 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Runs named steps once, in order, in a background thread.
+
+    The status and duration of every step are kept so readiness can be
+    shown while the server is already answering requests; a failed step
+    is recorded and the next one still runs.
+    """
+
+    def __init__(self, steps):
+        # steps: (name, function) pairs
+        self.steps = list(steps)
+        self.status = {name: "pending" for name, _ in self.steps}
+        self.seconds = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.finished = None
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name, step in self.steps:
+            self.status[name] = "running"
+            start = time.perf_counter()
+            try:
+                step()
+                self.status[name] = "done"
+            except Exception as error:
+                self.status[name] = "failed"
+                self.errors[name] = repr(error)
+                logger.exception("warm-up step %s failed", name)
+            self.seconds[name] = time.perf_counter() - start
+        self.finished = time.perf_counter()
+        logger.info("warm-up finished in %.2fs", self.finished - self.started)
+
+    @property
+    def ready(self):
+        return self.finished is not None
+
+    @property
+    def done(self):
+        return sum(status in ("done", "failed") for status in self.status.values())
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def report(self):
+        return pd.DataFrame({"step": [name for name, _ in self.steps],
+                             "status": [self.status[name] for name, _ in self.steps],
+                             "seconds": [self.seconds.get(name) for name, _ in self.steps],
+                             "error": [self.errors.get(name, "") for name, _ in self.steps]})